@@ -4,15 +4,27 @@
 """
 import os
 import sys
+import glob
+import shutil
 import subprocess
 from pathlib import Path
 
-def run_command(cmd, check=True):
-    """运行命令并返回结果"""
-    print(f"Running: {cmd}")
-    result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
+def run_command(argv, check=True, stream=True):
+    """运行命令并返回结果
+    
+    直接exec参数列表，不经过shell；stream=True时输出实时打印到终端，
+    否则捕获输出（失败时用于错误报告）。
+    """
+    print(f"Running: {' '.join(argv)}")
+    if stream:
+        result = subprocess.run(argv)
+    else:
+        result = subprocess.run(argv, capture_output=True, text=True)
     if check and result.returncode != 0:
-        print(f"Error: {result.stderr}")
+        if stream:
+            print(f"Error: 命令退出码 {result.returncode}")
+        else:
+            print(f"Error: {result.stderr}")
         sys.exit(1)
     return result
 
@@ -24,19 +36,20 @@ def main():
     
     # 清理旧的构建
     print("🧹 清理旧的构建文件...")
-    run_command("rm -rf dist/ build/ *.egg-info/", check=False)
+    for path in ["dist", "build", *glob.glob("*.egg-info")]:
+        shutil.rmtree(path, ignore_errors=True)
     
     # 构建包
     print("🔨 构建包...")
-    run_command("python -m build")
+    run_command([sys.executable, "-m", "build"])
     
     # 检查包
     print("✅ 检查包...")
-    run_command("twine check dist/*")
+    run_command(["twine", "check"] + glob.glob("dist/*"))
     
     # 显示包信息
     print("📦 包信息:")
-    run_command("ls -la dist/")
+    run_command(["ls", "-la", "dist"])
     
     print("\n🚀 发布选项:")
     print("1. 发布到TestPyPI (测试): twine upload --repository testpypi dist/*")
@@ -49,7 +62,7 @@ def main():
     choice = input("\n是否现在发布到TestPyPI? (y/N): ").lower().strip()
     if choice == 'y':
         print("发布到TestPyPI...")
-        run_command("twine upload --repository testpypi dist/*")
+        run_command(["twine", "upload", "--repository", "testpypi"] + glob.glob("dist/*"))
         print("✅ 发布成功!")
         print("📦 包地址: https://test.pypi.org/project/leakage-buster/")
     else:
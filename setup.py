@@ -43,9 +43,9 @@ setup(
         "pandas>=2.0",
         "numpy>=1.23",
         "scikit-learn>=1.2",
+        "scipy>=1.8",
         "jinja2>=3.1",
         "pyyaml>=6.0",
-        "pydantic>=2.0",
         "psutil>=5.9",
     ],
     extras_require={
@@ -53,6 +53,7 @@ setup(
         "dev": [
             "pytest>=7.0",
             "pytest-cov>=4.0",
+            "pytest-xdist>=3.0",
             "black>=23.0",
             "ruff>=0.1",
             "mypy>=1.0",
@@ -65,6 +66,9 @@ setup(
         "perf": [
             "polars>=0.20.0",
             "joblib>=1.3",
+            "pyarrow>=14",
+            "orjson>=3.6",
+            "numba>=0.57",
         ],
     },
     entry_points={
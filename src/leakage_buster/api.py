@@ -1,17 +1,24 @@
 
 from __future__ import annotations
+import os
 import pandas as pd
+from collections import Counter
+from itertools import chain
 from typing import Dict, Optional, Any
-from .core.checks import run_checks
+from .core.checks import run_checks, parse_time_column, count_unique, NumericSummary
 from .core.fix_plan import create_fix_plan, FixPlan
 from .core.fix_apply import apply_fixes, get_fix_summary, validate_fix_plan
 from .core.cv_policy import audit_cv_policy
 from .core.simulator import run_time_series_simulation
 from .core.export import export_report
+from .core.report import render_report, write_meta
 
 class AuditResult:
     """审计结果类"""
     
+    # 使用 __slots__ 去掉实例 __dict__；作为库批量构建结果时内存更省、属性访问更快
+    __slots__ = ("data", "meta", "risks", "simulation", "policy_audit")
+    
     def __init__(self, data: Dict, meta: Dict):
         self.data = data
         self.meta = meta
@@ -19,15 +26,20 @@ class AuditResult:
         self.simulation = data.get("simulation")
         self.policy_audit = data.get("policy_audit")
     
+    @property
+    def _severity_counts(self) -> Counter:
+        """按严重程度统计风险数（单次遍历；risks 为可变列表，每次访问重新统计）"""
+        return Counter(risk.get("severity") for risk in self.risks)
+    
     @property
     def has_high_risk(self) -> bool:
         """是否有高危风险"""
-        return any(risk.get("severity") == "high" for risk in self.risks)
+        return self._severity_counts["high"] > 0
     
     @property
     def has_medium_risk(self) -> bool:
         """是否有中危风险"""
-        return any(risk.get("severity") == "medium" for risk in self.risks)
+        return self._severity_counts["medium"] > 0
     
     @property
     def risk_count(self) -> int:
@@ -37,36 +49,38 @@ class AuditResult:
     @property
     def high_risk_count(self) -> int:
         """高危风险数"""
-        return sum(1 for risk in self.risks if risk.get("severity") == "high")
+        return self._severity_counts["high"]
     
     @property
     def medium_risk_count(self) -> int:
         """中危风险数"""
-        return sum(1 for risk in self.risks if risk.get("severity") == "medium")
+        return self._severity_counts["medium"]
     
     @property
     def low_risk_count(self) -> int:
         """低危风险数"""
-        return sum(1 for risk in self.risks if risk.get("severity") == "low")
+        return self._severity_counts["low"]
     
     def to_dict(self) -> Dict:
         """转换为字典"""
+        counts = self._severity_counts
         return {
             "data": self.data,
             "meta": self.meta,
             "summary": {
                 "total_risks": self.risk_count,
-                "high_risks": self.high_risk_count,
-                "medium_risks": self.medium_risk_count,
-                "low_risks": self.low_risk_count,
-                "has_high_risk": self.has_high_risk,
-                "has_medium_risk": self.has_medium_risk
+                "high_risks": counts["high"],
+                "medium_risks": counts["medium"],
+                "low_risks": counts["low"],
+                "has_high_risk": counts["high"] > 0,
+                "has_medium_risk": counts["medium"] > 0
             }
         }
 
 def audit(df: pd.DataFrame, target: str, time_col: Optional[str] = None, 
           cv_type: Optional[str] = None, simulate_cv: Optional[str] = None,
           leak_threshold: float = 0.02, cv_policy_file: Optional[str] = None,
+          numeric_summary: Optional[NumericSummary] = None,
           **opts) -> AuditResult:
     """
     审计数据框的泄漏风险
@@ -79,21 +93,31 @@ def audit(df: pd.DataFrame, target: str, time_col: Optional[str] = None,
         simulate_cv: 是否启用时序模拟（可选）
         leak_threshold: 泄漏阈值（默认0.02）
         cv_policy_file: CV策略文件路径（可选）
+        numeric_summary: 预先计算的数值统计摘要（可选，如对完整文件流式计算的结果）
         **opts: 其他选项
     
     Returns:
         AuditResult: 审计结果
     """
+    # 时间列只解析一次、各列唯一值个数只统计一次，检测器与CV策略审计共享
+    parsed_time = parse_time_column(df, time_col)
+    try:
+        nunique = count_unique(df)
+    except (TypeError, ValueError):
+        # 含不可哈希值（如列表）的列：不共享计数，由各检测器与策略审计自行计算并各自记录错误
+        nunique = None
+    
     # 运行基础检测
-    results = run_checks(df, target=target, time_col=time_col, cv_type=cv_type)
+    results = run_checks(df, target=target, time_col=time_col, cv_type=cv_type, parsed_time=parsed_time,
+                         numeric_summary=numeric_summary, nunique=nunique, n_jobs=opts.get("n_jobs", 1))
     
     # 运行时序模拟（如果启用）
     simulation_results = None
     if simulate_cv == "time":
-        suspicious_cols = []
-        for risk in results.get("risks", []):
-            if "suspicious_columns" in risk.get("evidence", {}):
-                suspicious_cols.extend(risk["evidence"]["suspicious_columns"].keys())
+        # 多个风险项可能指向同一列，去重并排序以保证模拟输入确定
+        evidences = (risk.get("evidence", {}).get("suspicious_columns") or {} 
+                     for risk in results.get("risks", []))
+        suspicious_cols = sorted(set(chain.from_iterable(evidences)))
         
         if suspicious_cols:
             simulation_results = run_time_series_simulation(
@@ -103,11 +127,12 @@ def audit(df: pd.DataFrame, target: str, time_col: Optional[str] = None,
     # 运行CV策略审计（如果提供策略文件）
     policy_audit = None
     if cv_policy_file:
-        policy_audit = audit_cv_policy(df, target, time_col, cv_policy_file)
+        policy_audit = audit_cv_policy(df, target, time_col, cv_policy_file, parsed_time=parsed_time,
+                                       nunique=nunique)
     
     # 准备元数据
     meta = {
-        "n_rows": int(len(df)),
+        "n_rows": int(len(df.index)),
         "n_cols": int(df.shape[1]),
         "target": target,
         "time_col": time_col,
@@ -177,9 +202,6 @@ def export_audit_result(audit_result: AuditResult, output_dir: str,
     Returns:
         Dict: 导出结果
     """
-    import os
-    from .core.report import render_report, write_meta
-    
     # 创建输出目录
     os.makedirs(output_dir, exist_ok=True)
     
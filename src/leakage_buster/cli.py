@@ -1,15 +1,7 @@
 
 from __future__ import annotations
-import argparse, os, json, sys
-import pandas as pd
-from .core.checks import run_checks
-from .core.report import render_report, write_fix_script, write_meta
-from .core.simulator import run_time_series_simulation
-from .core.cv_policy import audit_cv_policy
-from .core.export import export_report
-from .core.loader import load_data, estimate_memory_usage
-from .core.parallel import ParallelProcessor
-from .api import audit, plan_fixes, apply_fixes_to_dataframe, export_audit_result
+import argparse, os, json, sys, hashlib, functools
+from concurrent.futures import ThreadPoolExecutor
 
 # 退出码定义
 EXIT_OK = 0
@@ -17,106 +9,212 @@ EXIT_WARNINGS = 2
 EXIT_HIGH_LEAKAGE = 3
 EXIT_INVALID_CONFIG = 4
 
-def run(train_path: str, target: str, time_col: str | None, out_dir: str, 
+# 超过该大小的训练文件自动启用流式数值统计（未显式指定 --chunksize 时）
+AUTO_CHUNK_BYTES = 1 << 30
+AUTO_CHUNKSIZE = 1_000_000
+
+def _error(error_type: str, message: str, exit_code: int = EXIT_INVALID_CONFIG, **details) -> dict:
+    """构造统一的错误返回结构"""
+    return {
+        "status": "error",
+        "exit_code": exit_code,
+        "error": {
+            "type": error_type,
+            "message": message,
+            "details": details
+        }
+    }
+
+@functools.lru_cache(maxsize=1)
+def _source_digest() -> str:
+    """包内全部 .py 源码的摘要（每进程计算一次）；检测逻辑变化即使版本号不变也会使审计缓存失效"""
+    h = hashlib.blake2b(digest_size=16)
+    root = os.path.dirname(os.path.abspath(__file__))
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if d != "__pycache__")
+        for name in sorted(filenames):
+            if name.endswith(".py"):
+                path = os.path.join(dirpath, name)
+                h.update(os.path.relpath(path, root).encode())
+                with open(path, "rb") as f:
+                    h.update(f.read())
+    return h.hexdigest()
+
+def _audit_cache_path(out_dir: str, train_path: str, train_stat: os.stat_result, **params) -> str:
+    """审计结果缓存路径：键为训练文件（绝对路径+修改时间+大小）、策略文件修改时间、影响审计的参数、版本号及源码摘要"""
+    from . import __version__
+    parts = [os.path.abspath(train_path), train_stat.st_mtime_ns, train_stat.st_size, __version__, _source_digest()]
+    policy_file = params.get("cv_policy_file")
+    if policy_file and os.path.exists(policy_file):
+        parts.append(os.stat(policy_file).st_mtime_ns)
+    parts.extend(f"{k}={params[k]!r}" for k in sorted(params))
+    key = hashlib.blake2b(":".join(map(str, parts)).encode(), digest_size=16).hexdigest()
+    return os.path.join(out_dir, ".cache", f"audit-{key}.json")
+
+def _load_audit_cache(path: str) -> dict | None:
+    """读取审计结果缓存，不存在或损坏时返回None"""
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def run(train_path, target: str, time_col: str | None, out_dir: str, 
         cv_type: str | None = None, simulate_cv: str | None = None, 
         leak_threshold: float = 0.02, cv_policy_file: str | None = None,
         export: str | None = None, export_sarif: str | None = None, 
         auto_fix: str | None = None, fix_json: str | None = None, 
         fixed_train: str | None = None, engine: str = "pandas",
-        n_jobs: int = -1, memory_cap: int = 4096, sample_ratio: float | None = None):
-    """运行泄漏检测 - v1.0版本"""
+        n_jobs: int = -1, memory_cap: int = 4096, sample_ratio: float | None = None,
+        no_cache: bool = False, chunksize: int | None = None, usecols: list | None = None,
+        cache: bool = False):
+    """运行泄漏检测 - v1.0版本
+    
+    train_path 为CSV路径，或已在内存中的数据框（跳过CSV写出与重新解析；不使用审计缓存与流式统计）。
+    cache=True 时启用磁盘缓存：CSV解析结果的Parquet缓存（位于 DEFAULT_CACHE_DIR，按LRU限制文件数）
+    与审计结果缓存（位于 out_dir/.cache）；no_cache=True 时一律禁用。
+    """
     try:
+        # 内存数据框：元数据与修复计划中以 "<dataframe>" 作为数据来源
+        frame = None
+        if not isinstance(train_path, (str, os.PathLike)):
+            frame, train_path = train_path, "<dataframe>"
+        
         # 验证输入文件
-        if not os.path.exists(train_path):
-            return {
-                "status": "error",
-                "exit_code": EXIT_INVALID_CONFIG,
-                "error": {
-                    "type": "FileNotFoundError",
-                    "message": f"Training file not found: {train_path}",
-                    "details": {"file": train_path}
-                }
-            }
+        # 只stat一次：既判断存在性，又把结果交给加载器做大小判断与缓存键计算
+        if frame is None:
+            try:
+                train_stat = os.stat(train_path)
+            except OSError:
+                return _error("FileNotFoundError", f"Training file not found: {train_path}", file=train_path)
+            if chunksize is None and train_stat.st_size > AUTO_CHUNK_BYTES:
+                chunksize = AUTO_CHUNKSIZE
+                print(f"📦 训练文件超过 {AUTO_CHUNK_BYTES >> 30} GB，自动启用流式统计 (chunksize={chunksize:,})")
         
-        # 估算内存使用
-        try:
-            memory_info = estimate_memory_usage(train_path)
-            print(f"📊 数据概览: {memory_info['total_rows']:,} 行, {memory_info['columns']} 列")
-            print(f"💾 预估内存: {memory_info['estimated_memory_mb']:.1f} MB")
-            
-            # 如果预估内存超过限制，启用采样
-            if memory_info['estimated_memory_mb'] > memory_cap * 0.8:
-                if sample_ratio is None:
-                    sample_ratio = min(0.5, memory_cap / memory_info['estimated_memory_mb'])
-                    print(f"⚠️  内存超限，自动启用采样: {sample_ratio:.1%}")
-        except Exception as e:
-            print(f"⚠️  内存估算失败: {e}")
+        # 延迟导入pandas等重型依赖，--help与早期错误路径无需加载
+        from .core.loader import load_data, estimate_memory_usage, read_csv_columns, read_csv_chunks, DEFAULT_CACHE_DIR
+        from .core.report import render_report, write_fix_script, write_meta
+        from .api import audit, plan_fixes, apply_fixes_to_dataframe
         
-        # 读取数据
-        try:
-            print(f"🔄 加载数据 (引擎: {engine})...")
-            df = load_data(
-                train_path, 
-                engine=engine, 
-                memory_cap_mb=memory_cap,
-                sample_ratio=sample_ratio
-            )
-            print(f"✅ 数据加载完成: {len(df):,} 行, {len(df.columns)} 列")
-        except Exception as e:
-            return {
-                "status": "error",
-                "exit_code": EXIT_INVALID_CONFIG,
-                "error": {
-                    "type": "FileNotFoundError",
-                    "message": f"Failed to read CSV file: {str(e)}",
-                    "details": {"file": train_path, "error": str(e)}
-                }
-            }
+        # 读取表头并验证列，避免在完整解析后才发现配置错误
+        if frame is not None:
+            columns = [str(c) for c in frame.columns]
+        else:
+            try:
+                columns = read_csv_columns(train_path)
+            except Exception as e:
+                return _error("FileNotFoundError", f"Failed to read CSV file: {str(e)}", file=train_path, error=str(e))
+        
+        # 集合成员判断为O(1)；错误详情仍按文件顺序返回原列表
+        column_set = set(columns)
         
         # 验证目标列
-        if target not in df.columns:
-            return {
-                "status": "error",
-                "exit_code": EXIT_INVALID_CONFIG,
-                "error": {
-                    "type": "ValidationError",
-                    "message": f"Target column '{target}' not found in data",
-                    "details": {"column": target, "available_columns": list(df.columns)}
-                }
-            }
+        if target not in column_set:
+            return _error("ValidationError", f"Target column '{target}' not found in data", column=target, available_columns=columns)
         
         # 验证时间列
-        if time_col and time_col not in df.columns:
-            return {
-                "status": "error",
-                "exit_code": EXIT_INVALID_CONFIG,
-                "error": {
-                    "type": "ValidationError",
-                    "message": f"Time column '{time_col}' not found in data",
-                    "details": {"column": time_col, "available_columns": list(df.columns)}
-                }
-            }
+        if time_col and time_col not in column_set:
+            return _error("ValidationError", f"Time column '{time_col}' not found in data", column=time_col, available_columns=columns)
         
-        # 使用API进行审计
-        try:
-            print("🔍 开始审计...")
-            audit_result = audit(
-                df, target=target, time_col=time_col, cv_type=cv_type,
-                simulate_cv=simulate_cv, leak_threshold=leak_threshold,
-                cv_policy_file=cv_policy_file, engine=engine, n_jobs=n_jobs,
-                memory_cap=memory_cap, sample_ratio=sample_ratio
+        # 列投影：只解析指定列，目标列与时间列总是保留
+        read_kwargs = {}
+        if usecols:
+            missing = [c for c in usecols if c not in column_set]
+            if missing:
+                return _error("ValidationError", f"Columns not found in data: {', '.join(missing)}", columns=missing, available_columns=columns)
+            keep = set(usecols) | {target} | ({time_col} if time_col else set())
+            read_kwargs["usecols"] = [c for c in columns if c in keep]
+        
+        # 审计结果缓存（--cache 启用）：文件、参数与源码未变时直接复用上次结果，跳过加载与审计（--auto-fix apply 需要数据框，不走缓存）
+        from .api import AuditResult
+        from .core.report import write_json
+        audit_cache = None
+        cached = None
+        if frame is None and cache and not no_cache and auto_fix != "apply":
+            audit_cache = _audit_cache_path(
+                out_dir, train_path, train_stat,
+                target=target, time_col=time_col, cv_type=cv_type, simulate_cv=simulate_cv,
+                leak_threshold=leak_threshold, cv_policy_file=cv_policy_file, memory_cap=memory_cap,
+                sample_ratio=sample_ratio, chunksize=chunksize, usecols=read_kwargs.get("usecols"), engine=engine
             )
-            print(f"✅ 审计完成: 发现 {audit_result.risk_count} 个风险")
-        except Exception as e:
-            return {
-                "status": "error",
-                "exit_code": EXIT_INVALID_CONFIG,
-                "error": {
-                    "type": "RuntimeError",
-                    "message": f"Audit failed: {str(e)}",
-                    "details": {"error": str(e)}
-                }
-            }
+            cached = _load_audit_cache(audit_cache)
+        
+        if cached is not None:
+            print("♻️  输入与参数未变化，复用审计缓存")
+            audit_result = AuditResult(cached["data"], cached["audit_meta"])
+            n_rows, n_cols = cached["n_rows"], cached["n_cols"]
+            df = None
+        else:
+            numeric_summary = None
+            if frame is not None:
+                # 内存数据框：按列投影，按固定种子整体抽样（抽中的行与CSV分块采样加载不同），不做CSV往返
+                df = frame[read_kwargs["usecols"]] if usecols else frame
+                if sample_ratio and sample_ratio < 1.0:
+                    df = df.sample(frac=sample_ratio, random_state=42).sort_index()
+                print(f"✅ 使用内存数据框: {len(df):,} 行, {len(df.columns)} 列")
+            else:
+                # 估算内存使用
+                try:
+                    memory_info = estimate_memory_usage(train_path)
+                    print(f"📊 数据概览: {memory_info['total_rows']:,} 行, {memory_info['columns']} 列")
+                    print(f"💾 预估内存: {memory_info['estimated_memory_mb']:.1f} MB")
+                
+                    # 如果预估内存超过限制，启用采样
+                    if memory_info['estimated_memory_mb'] > memory_cap * 0.8:
+                        if sample_ratio is None:
+                            sample_ratio = min(0.5, memory_cap / memory_info['estimated_memory_mb'])
+                            print(f"⚠️  内存超限，自动启用采样: {sample_ratio:.1%}")
+                except Exception as e:
+                    print(f"⚠️  内存估算失败: {e}")
+                
+                # 读取数据
+                try:
+                    print(f"🔄 加载数据 (引擎: {engine})...")
+                    df = load_data(
+                        train_path, 
+                        engine=engine, 
+                        memory_cap_mb=memory_cap,
+                        sample_ratio=sample_ratio,
+                        cache_dir=DEFAULT_CACHE_DIR if cache and not no_cache else None,
+                        file_stat=train_stat,
+                        **read_kwargs
+                    )
+                    print(f"✅ 数据加载完成: {len(df):,} 行, {len(df.columns)} 列")
+                except Exception as e:
+                    return _error("FileNotFoundError", f"Failed to read CSV file: {str(e)}", file=train_path, error=str(e))
+                
+                # 流式统计：数值列统计量按块累积，覆盖完整文件（即使加载的数据框经过采样）
+                if chunksize:
+                    try:
+                        from .core.checks import summarize_numeric_chunks
+                        print(f"🧮 流式计算数值统计 (chunksize={chunksize:,})...")
+                        numeric_summary = summarize_numeric_chunks(read_csv_chunks(train_path, chunksize, **read_kwargs), target)
+                    except Exception as e:
+                        print(f"⚠️  流式统计失败，回退到内存计算: {e}")
+            
+            # 使用API进行审计
+            try:
+                print("🔍 开始审计...")
+                audit_result = audit(
+                    df, target=target, time_col=time_col, cv_type=cv_type,
+                    simulate_cv=simulate_cv, leak_threshold=leak_threshold,
+                    cv_policy_file=cv_policy_file, engine=engine, n_jobs=n_jobs,
+                    memory_cap=memory_cap, sample_ratio=sample_ratio,
+                    numeric_summary=numeric_summary
+                )
+                print(f"✅ 审计完成: 发现 {audit_result.risk_count} 个风险")
+            except Exception as e:
+                return _error("RuntimeError", f"Audit failed: {str(e)}", error=str(e))
+        
+            n_rows, n_cols = int(len(df.index)), int(df.shape[1])
+            if audit_cache:
+                try:
+                    os.makedirs(os.path.dirname(audit_cache), exist_ok=True)
+                    payload = {"data": audit_result.data, "audit_meta": audit_result.meta,
+                               "n_rows": n_rows, "n_cols": n_cols}
+                    write_json(audit_cache, payload)
+                except Exception as e:
+                    print(f"⚠️  审计缓存写入失败: {e}")
         
         # 确定退出码
         exit_code = EXIT_OK
@@ -138,19 +236,10 @@ def run(train_path: str, target: str, time_col: str | None, out_dir: str,
                 # 写入修复计划JSON
                 if fix_json:
                     os.makedirs(os.path.dirname(fix_json), exist_ok=True)
-                    with open(fix_json, 'w', encoding='utf-8') as f:
-                        json.dump(fix_plan.model_dump(), f, ensure_ascii=False, indent=2)
+                    write_json(fix_json, fix_plan.to_dict())
                     print(f"✅ 修复计划已保存: {fix_json}")
             except Exception as e:
-                return {
-                    "status": "error",
-                    "exit_code": EXIT_INVALID_CONFIG,
-                    "error": {
-                        "type": "RuntimeError",
-                        "message": f"Fix planning failed: {str(e)}",
-                        "details": {"error": str(e)}
-                    }
-                }
+                return _error("RuntimeError", f"Fix planning failed: {str(e)}", error=str(e))
         
         elif auto_fix == "apply":
             try:
@@ -162,18 +251,17 @@ def run(train_path: str, target: str, time_col: str | None, out_dir: str,
                     os.makedirs(os.path.dirname(fixed_train), exist_ok=True)
                     fixed_df.to_csv(fixed_train, index=False)
                     print(f"✅ 修复后数据已保存: {fixed_train}")
+                del fixed_df
             except Exception as e:
-                return {
-                    "status": "error",
-                    "exit_code": EXIT_INVALID_CONFIG,
-                    "error": {
-                        "type": "RuntimeError",
-                        "message": f"Fix application failed: {str(e)}",
-                        "details": {"error": str(e)}
-                    }
-                }
+                return _error("RuntimeError", f"Fix application failed: {str(e)}", error=str(e))
+        
+        # 创建输出目录
+        try:
+            os.makedirs(out_dir, exist_ok=True)
+        except Exception as e:
+            return _error("FileNotFoundError", f"Failed to create output directory: {str(e)}", directory=out_dir, error=str(e))
         
-        # 准备元数据
+        # 准备元数据（放在所有提前返回之后，避免无谓的 git 子进程调用）
         meta = {
             "args": {
                 "train": train_path, 
@@ -192,10 +280,14 @@ def run(train_path: str, target: str, time_col: str | None, out_dir: str,
                 "engine": engine,
                 "n_jobs": n_jobs,
                 "memory_cap": memory_cap,
-                "sample_ratio": sample_ratio
+                "sample_ratio": sample_ratio,
+                "no_cache": no_cache,
+                "cache": cache,
+                "chunksize": chunksize,
+                "usecols": usecols
             },
-            "n_rows": int(len(df)),
-            "n_cols": int(df.shape[1]),
+            "n_rows": n_rows,
+            "n_cols": n_cols,
             "target": target,
             "time_col": time_col,
             "cv_type": cv_type,
@@ -215,62 +307,30 @@ def run(train_path: str, target: str, time_col: str | None, out_dir: str,
             "random_seed": "42"
         }
         
-        # 创建输出目录
-        try:
-            os.makedirs(out_dir, exist_ok=True)
-        except Exception as e:
-            return {
-                "status": "error",
-                "exit_code": EXIT_INVALID_CONFIG,
-                "error": {
-                    "type": "FileNotFoundError",
-                    "message": f"Failed to create output directory: {str(e)}",
-                    "details": {"directory": out_dir, "error": str(e)}
-                }
-            }
-        
         # 生成输出文件
         try:
             print("📄 生成报告...")
-            write_meta(meta, out_dir)
-            report_path = render_report(audit_result.data, meta, out_dir, audit_result.simulation, audit_result.policy_audit)
-            fix_path = write_fix_script(audit_result.data, out_dir)
+            # 元数据、HTML报告与修复脚本互不依赖，并发写出以重叠渲染与磁盘I/O
+            with ThreadPoolExecutor(max_workers=3) as pool:
+                meta_future = pool.submit(write_meta, meta, out_dir)
+                report_future = pool.submit(render_report, audit_result.data, meta, out_dir,
+                                            audit_result.simulation, audit_result.policy_audit)
+                fix_future = pool.submit(write_fix_script, audit_result.data, out_dir)
+                meta_future.result()
+                report_path = report_future.result()
+                fix_path = fix_future.result()
             print(f"✅ 报告已生成: {report_path}")
         except Exception as e:
-            return {
-                "status": "error",
-                "exit_code": EXIT_INVALID_CONFIG,
-                "error": {
-                    "type": "RuntimeError",
-                    "message": f"Failed to generate output files: {str(e)}",
-                    "details": {"error": str(e)}
-                }
-            }
+            return _error("RuntimeError", f"Failed to generate output files: {str(e)}", error=str(e))
         
-        # 处理导出
-        export_results = {}
-        if export:
-            try:
-                print(f"📤 导出 {export.upper()}...")
-                if export == "pdf":
-                    pdf_path = os.path.join(out_dir, "report.pdf")
-                    export_result = export_report(report_path, pdf_path, "pdf")
-                    export_results["pdf"] = export_result
-                    print(f"✅ PDF已导出: {pdf_path}")
-                else:
-                    export_results["export"] = {"status": "error", "message": f"Unsupported export type: {export}"}
-            except Exception as e:
-                export_results["export"] = {"status": "error", "message": f"Export failed: {str(e)}"}
+        # 报告已生成，不再需要数据框；导出（可能拉起PDF渲染）前释放内存，避免双重峰值
+        del df
+        if export or export_sarif:
+            import gc
+            gc.collect()
         
-        if export_sarif:
-            try:
-                print("📤 导出SARIF...")
-                sarif_path = export_sarif
-                export_result = export_report(None, sarif_path, "sarif", audit_result.data)
-                export_results["sarif"] = export_result
-                print(f"✅ SARIF已导出: {sarif_path}")
-            except Exception as e:
-                export_results["sarif"] = {"status": "error", "message": f"SARIF export failed: {str(e)}"}
+        # 处理导出（未请求导出时不进入任何try块）
+        export_results = _maybe_export(export, export_sarif, report_path, out_dir, audit_result.data) if export or export_sarif else None
         
         # 返回成功结果
         result_data = {
@@ -288,21 +348,18 @@ def run(train_path: str, target: str, time_col: str | None, out_dir: str,
             }
         }
         
-        # 添加模拟结果
+        # 可选结果：仅在对应功能产生输出时加入，最后一次性合并
+        extras = {}
         if audit_result.simulation:
-            result_data["simulation"] = audit_result.simulation
-        
-        # 添加策略审计结果
+            extras["simulation"] = audit_result.simulation
         if audit_result.policy_audit:
-            result_data["policy_audit"] = audit_result.policy_audit
-        
-        # 添加导出结果
+            extras["policy_audit"] = audit_result.policy_audit
         if export_results:
-            result_data["exports"] = export_results
-        
-        # 添加修复计划
+            extras["exports"] = export_results
         if fix_plan:
-            result_data["fix_plan"] = fix_plan.model_dump()
+            extras["fix_plan"] = fix_plan.model_dump()
+        if extras:
+            result_data |= extras
         
         return {
             "status": "success",
@@ -312,15 +369,42 @@ def run(train_path: str, target: str, time_col: str | None, out_dir: str,
         
     except Exception as e:
         # 捕获未预期的错误
-        return {
-            "status": "error",
-            "exit_code": EXIT_INVALID_CONFIG,
-            "error": {
-                "type": "RuntimeError",
-                "message": f"Unexpected error: {str(e)}",
-                "details": {"error": str(e)}
-            }
-        }
+        return _error("RuntimeError", f"Unexpected error: {str(e)}", error=str(e))
+
+def _maybe_export(export, export_sarif, report_path, out_dir, data):
+    """执行请求的导出（PDF/SARIF），返回各导出结果；导出失败记录为error而不中断
+    
+    PDF与SARIF导出互不依赖，同时请求时并发执行（PDF渲染可能拉起子进程）。
+    """
+    from .core.export import export_report
+    
+    def _export_pdf():
+        try:
+            print(f"📤 导出 {export.upper()}...")
+            if export == "pdf":
+                pdf_path = os.path.join(out_dir, "report.pdf")
+                export_result = export_report(report_path, pdf_path, "pdf")
+                print(f"✅ PDF已导出: {pdf_path}")
+                return "pdf", export_result
+            return "export", {"status": "error", "message": f"Unsupported export type: {export}"}
+        except Exception as e:
+            return "export", {"status": "error", "message": f"Export failed: {str(e)}"}
+    
+    def _export_sarif():
+        try:
+            print("📤 导出SARIF...")
+            sarif_path = export_sarif
+            export_result = export_report(None, sarif_path, "sarif", data)
+            print(f"✅ SARIF已导出: {sarif_path}")
+            return "sarif", export_result
+        except Exception as e:
+            return "sarif", {"status": "error", "message": f"SARIF export failed: {str(e)}"}
+    
+    tasks = ([_export_pdf] if export else []) + ([_export_sarif] if export_sarif else [])
+    if len(tasks) == 1:
+        return dict([tasks[0]()])
+    with ThreadPoolExecutor(max_workers=len(tasks)) as pool:
+        return dict(pool.map(lambda task: task(), tasks))
 
 def build_parser():
     p = argparse.ArgumentParser(
@@ -377,6 +461,15 @@ Examples:
                        help="Memory limit in MB (default: 4096)")
     run_p.add_argument("--sample-ratio", type=float, default=None,
                        help="Sample ratio for large datasets (0.0-1.0)")
+    run_p.add_argument("--cache", action="store_true",
+                       help="Enable the on-disk caches: Parquet cache of parsed CSV files (under $XDG_CACHE_HOME/leakage-buster, "
+                            "LRU-bounded) and audit result cache (under OUT/.cache)")
+    run_p.add_argument("--no-cache", action="store_true",
+                       help="Disable all on-disk caches (overrides --cache)")
+    run_p.add_argument("--chunksize", type=int, default=None,
+                       help="Stream the CSV in chunks of this many rows to compute numeric leakage statistics")
+    run_p.add_argument("--usecols", type=lambda s: [c.strip() for c in s.split(",") if c.strip()], default=None,
+                       help="Comma-separated columns to load (target and time column are always kept)")
     
     # 导出参数
     run_p.add_argument("--export", type=str, choices=["pdf"], default=None,
@@ -403,10 +496,12 @@ def main():
                     args.cv_type, args.simulate_cv, args.leak_threshold,
                     args.cv_policy_file, args.export, args.export_sarif,
                     args.auto_fix, args.fix_json, args.fixed_train,
-                    args.engine, args.n_jobs, args.memory_cap, args.sample_ratio)
+                    args.engine, args.n_jobs, args.memory_cap, args.sample_ratio,
+                    args.no_cache, args.chunksize, args.usecols, cache=args.cache)
         
         # 输出JSON结果
-        print(json.dumps(result, ensure_ascii=False, indent=2))
+        from .core.report import dumps_json
+        print(dumps_json(result))
         
         # 设置退出码
         sys.exit(result["exit_code"])
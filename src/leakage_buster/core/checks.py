@@ -1,13 +1,15 @@
 
 from __future__ import annotations
 from dataclasses import dataclass, asdict
-from typing import Dict, List, Optional, Tuple, Protocol
+from typing import Dict, Iterable, List, Optional, Tuple, Protocol
 import numpy as np
 import pandas as pd
-from sklearn.linear_model import LinearRegression
-from sklearn.metrics import roc_auc_score
-from sklearn.model_selection import TimeSeriesSplit, KFold
-import re
+from .parallel import parallel_apply
+
+def _kernels():
+    """numba 内核模块，首次调用时才导入：numba 导入约需1秒，只导入本模块（如CLI帮助、报告渲染）时不承担"""
+    from . import kernels
+    return kernels
 
 @dataclass
 class RiskItem:
@@ -18,6 +20,248 @@ class RiskItem:
     leak_score: float = 0.0
     def to_dict(self): return asdict(self)
 
+def parse_time_column(df: pd.DataFrame, time_col: Optional[str]) -> Optional[pd.Series]:
+    """将时间列解析为datetime64（无效值为NaT），供各检测器共享；列不存在或解析失败时返回None"""
+    if not time_col or time_col not in df.columns:
+        return None
+    try:
+        return pd.to_datetime(df[time_col], errors="coerce", cache=True)
+    except Exception:
+        return None
+
+def _column_block(df: pd.DataFrame, cols: List[str], dtype=np.float64) -> np.ndarray:
+    """将若干数值列直接写入一个预分配的列优先矩阵（N×C），缺失值为 NaN
+    
+    NumPy 类型的列以视图读取、写入时一次完成类型转换，不构造中间 DataFrame，也不为填充缺失值复制；
+    列优先布局使 X.T 为行连续，numba 内核无需再复制。
+    """
+    X = np.empty((len(df.index), len(cols)), dtype=dtype, order="F")
+    for j, c in enumerate(cols):
+        s = df[c]
+        X[:, j] = s.to_numpy() if isinstance(s.dtype, np.dtype) else s.to_numpy(dtype=dtype, na_value=np.nan)
+    return X
+
+def _numpy_block_stats(X: np.ndarray, yv: np.ndarray) -> np.ndarray:
+    """NumPy 向量化路径：返回单个列块 X（形状 N×C）的 (5, C) 统计量 mean/std/min/max/corr
+    
+    先用一次 min/max 归约找出常数列（std 为 0、corr 为 0），其余列由原始矩 Σx²、Σx·yc 直接得到方差与协方差，
+    不分配中心化临时矩阵；均值相对离散程度过大（相减抵消损失精度）的列回退中心化计算。
+    """
+    n = len(yv)
+    out = np.empty((5, X.shape[1]), dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        out[2] = lo = X.min(axis=0)
+        out[3] = hi = X.max(axis=0)
+        out[0] = mean = X.mean(axis=0)
+        live = ~(hi == lo)  # 含缺失值的列保留，其结果为 NaN
+        out[1, ~live] = 0.0
+        out[4, ~live] = 0.0
+        if live.any():
+            Xl = X if live.all() else X[:, live]
+            ml = mean[live]
+            yc = (yv - yv.mean()).astype(X.dtype, copy=False)
+            sy = np.sqrt(np.dot(yc, yc) / n)
+            # yc 之和为 0，故 yc·X 即协方差，无需中心化 X
+            var = np.einsum("ij,ij->j", Xl, Xl) / n - ml * ml
+            cov = (yc @ Xl) / n
+            # 相对方差误差约为 eps·mean²/var，超过 sqrt(eps) 时按中心化重算
+            unstable = ~(var > np.sqrt(np.finfo(X.dtype).eps) * ml * ml)
+            if unstable.any():
+                Xc = Xl[:, unstable] - ml[unstable].astype(X.dtype, copy=False)
+                var[unstable] = np.einsum("ij,ij->j", Xc, Xc) / n
+                cov[unstable] = (yc @ Xc) / n
+            sx = np.sqrt(var)
+            out[1, live] = sx
+            out[4, live] = cov / (sx * sy)
+    return out
+
+def _block_correlations(X: np.ndarray, yv: np.ndarray) -> np.ndarray:
+    """计算单个列块 X（形状 N×C）各列与 yv 的相关系数"""
+    col_corrs = _kernels().col_corrs
+    if col_corrs is not None and len(yv) > 0:
+        # 内核以 float64 累加，X 可为 float32 以减半内存带宽
+        return col_corrs(np.ascontiguousarray(X.T), yv)
+    return _numpy_block_stats(X, yv)[4]
+
+def column_correlations(df: pd.DataFrame, cols: List[str], y: np.ndarray, block_size: int = 64,
+                        screen_threshold: Optional[float] = None) -> np.ndarray:
+    """向量化计算各列与 y 的 Pearson 相关系数
+    
+    按列分块转换为矩阵以限制峰值内存；常数列返回 0，含缺失值的列返回 NaN。
+    安装 numba 时使用并行 JIT 内核，否则走 NumPy 向量化路径。
+    
+    NumPy 路径下给定 screen_threshold 时先用 float32 粗筛（内存带宽减半），再将 |corr| 接近或超过阈值的列、
+    以及 float32 精度不足的列（溢出，或取值偏移远大于取值范围）按 float64 精算，
+    阈值判断与证据数值与纯 float64 计算一致。
+    """
+    yv = np.asarray(y, dtype=np.float64)
+    # numba 内核本身受计算而非带宽限制，float32 粗筛仅用于 NumPy 路径
+    screen = screen_threshold is not None and _kernels().col_corrs is None
+    dtype = np.float32 if screen else np.float64
+    corrs = np.empty(len(cols), dtype=np.float64)
+    imprecise = np.zeros(len(cols), dtype=bool)
+    for start in range(0, len(cols), block_size):
+        with np.errstate(over="ignore"):
+            X = _column_block(df, cols[start:start + block_size], dtype)
+        stop = start + X.shape[1]
+        corrs[start:stop] = _block_correlations(X, yv)
+        if screen:
+            lo, hi = X.min(axis=0), X.max(axis=0)
+            with np.errstate(over="ignore", invalid="ignore"):
+                # float32 仅有24位尾数：转换溢出，或取值偏移超过范围的 2^10 倍时有效精度不足
+                span = hi - lo
+                imprecise[start:stop] = np.isinf(lo) | np.isinf(hi) | \
+                    ((span > 0) & (np.maximum(np.abs(lo), np.abs(hi)) > 1024.0 * span))
+    if screen:
+        # 留 0.02 余量吸收 float32 误差
+        refine = np.flatnonzero((np.abs(corrs) >= screen_threshold - 0.02) | imprecise)
+        for start in range(0, len(refine), block_size):
+            idx = refine[start:start + block_size]
+            X = _column_block(df, [cols[i] for i in idx])
+            corrs[idx] = _block_correlations(X, yv)
+    return corrs
+
+@dataclass
+class NumericSummary:
+    """数值列统计摘要（列式存储：每项统计量一个数组，按 columns 顺序对齐）
+    
+    由 DetectorRegistry 对数值块（跳过单值列）遍历一次生成，并通过 kwargs["numeric_summary"] 共享给各检测器。
+    各检测器在这些数组上做布尔掩码筛选，只在生成证据时转换为逐列字典。
+    """
+    columns: List[str]
+    mean: np.ndarray
+    std: np.ndarray
+    min: np.ndarray
+    max: np.ndarray
+    corr: np.ndarray
+    target_mean: float
+    
+    def __post_init__(self):
+        self.positions = {c: i for i, c in enumerate(self.columns)}
+        self._cv: Optional[np.ndarray] = None
+    
+    @property
+    def cv(self) -> np.ndarray:
+        """变异系数 std / (mean + 1e-8)，首次访问时整块计算并缓存"""
+        if self._cv is None:
+            with np.errstate(divide="ignore", invalid="ignore"):
+                self._cv = self.std / (self.mean + 1e-8)
+        return self._cv
+
+def numeric_columns(df: pd.DataFrame) -> List[str]:
+    """数值列名列表（含目标列），供各检测器共享"""
+    return df.select_dtypes(include=[np.number]).columns.tolist()
+
+# 有序性预检的前缀长度：未排序的列通常在前缀内即可判定，不必对整列做比较
+_SORTED_PROBE = 1024
+
+def _sorted_nunique(arr: np.ndarray) -> Optional[int]:
+    """已排序（非降序）的数值/时间一维数组直接以相邻比较计数唯一值，不建哈希表；未排序或含缺失值时返回None
+    
+    object列逐元素比较在Python层进行，比哈希计数更慢，不走此路径。
+    """
+    if arr.dtype.kind not in "biufmM" or len(arr) < 2:
+        return None
+    with np.errstate(invalid="ignore"):
+        head = arr[:_SORTED_PROBE]
+        if not bool((head[1:] >= head[:-1]).all()):  # NaN/NaT 比较为 False，自然回退
+            return None
+        if not bool((arr[1:] >= arr[:-1]).all()):
+            return None
+        return int((arr[1:] != arr[:-1]).sum()) + 1
+
+def count_unique(df: pd.DataFrame) -> pd.Series:
+    """各列唯一值个数，结果与 df.nunique(dropna=False) 一致
+    
+    已排序的列（如按时间排序的事件日志中的时间戳、自增ID）走相邻比较的快速路径，其余列回退 pandas 哈希计数。
+    """
+    if not df.columns.is_unique:
+        return df.nunique(dropna=False)
+    counts = {}
+    for c, s in df.items():
+        if isinstance(s.dtype, np.dtype):
+            k = _sorted_nunique(s.to_numpy())
+            if k is not None:
+                counts[c] = k
+    if not counts:
+        return df.nunique(dropna=False)
+    rest = [c for c in df.columns if c not in counts]
+    out = pd.Series(counts, dtype=np.int64)
+    if rest:
+        out = pd.concat([out, df[rest].nunique(dropna=False)])
+    return out.reindex(df.columns)
+
+def summarize_numeric(df: pd.DataFrame, target: str, block_size: int = 64,
+                      num_cols: Optional[List[str]] = None) -> NumericSummary:
+    """计算除目标列外所有数值列的均值/标准差/极值及与目标的相关系数（目标列非数值时抛出异常）
+    
+    num_cols 为预先取得的数值列名列表（见 numeric_columns），未提供时自行推断。
+    """
+    y = np.asarray(df[target].values, dtype=np.float64)
+    cols = [c for c in (num_cols if num_cols is not None else numeric_columns(df)) if c != target]
+    stats = np.empty((5, len(cols)), dtype=np.float64)
+    col_stats = _kernels().col_stats
+    for start in range(0, len(cols), block_size):
+        X = _column_block(df, cols[start:start + block_size])
+        stop = start + X.shape[1]
+        if col_stats is not None and len(y) > 0:
+            stats[:, start:stop] = col_stats(np.ascontiguousarray(X.T), y)
+        else:
+            stats[:, start:stop] = _numpy_block_stats(X, y)
+    return NumericSummary(cols, stats[0], stats[1], stats[2], stats[3], stats[4], float(np.mean(y)))
+
+def summarize_numeric_chunks(chunks: Iterable[pd.DataFrame], target: str) -> NumericSummary:
+    """流式计算数值统计摘要：逐块累积，内存占用与文件大小无关
+    
+    数值列以第一个分块的类型为准；各块的均值与中心化二阶矩按 Chan 等人的并行合并公式累加，
+    避免 Σx² 直接相减带来的精度损失。结果与 summarize_numeric 对全量数据的计算一致。
+    """
+    cols: List[str] = []
+    n = 0
+    for chunk in chunks:
+        if n == 0:
+            cols = [c for c in chunk.select_dtypes(include=[np.number]).columns if c != target]
+        y = np.asarray(chunk[target].values, dtype=np.float64)
+        # 只对类型与首块不一致（被解析为非数值）的列逐列强制转换，其余列直接写入列块，不经 DataFrame.apply
+        mixed = [c for c in cols if not pd.api.types.is_numeric_dtype(chunk[c].dtype)]
+        if mixed:
+            chunk = chunk.copy(deep=False)
+            for c in mixed:
+                chunk[c] = pd.to_numeric(chunk[c], errors="coerce")
+        X = _column_block(chunk, cols)
+        nb = len(y)
+        if nb == 0:
+            continue
+        mean_b = X.mean(axis=0)
+        ymean_b = y.mean()
+        Xc = X - mean_b
+        yc = y - ymean_b
+        m2_b = np.einsum("ij,ij->j", Xc, Xc)
+        cxy_b = yc @ Xc
+        m2y_b = float(np.dot(yc, yc))
+        if n == 0:
+            mean, ymean, m2, m2y, cxy = mean_b, ymean_b, m2_b, m2y_b, cxy_b
+            lo, hi = X.min(axis=0), X.max(axis=0)
+        else:
+            total = n + nb
+            dx = mean_b - mean
+            dy = ymean_b - ymean
+            w = n * nb / total
+            mean = mean + dx * nb / total
+            ymean = ymean + dy * nb / total
+            m2 = m2 + m2_b + dx * dx * w
+            m2y = m2y + m2y_b + dy * dy * w
+            cxy = cxy + cxy_b + dx * dy * w
+            lo, hi = np.minimum(lo, X.min(axis=0)), np.maximum(hi, X.max(axis=0))
+        n += nb
+    if n == 0:
+        raise ValueError("No rows to summarize")
+    constant = hi == lo
+    with np.errstate(divide="ignore", invalid="ignore"):
+        std = np.where(constant, 0.0, np.sqrt(m2 / n))
+        corr = np.where(constant, 0.0, cxy / np.sqrt(m2 * m2y))
+    return NumericSummary(cols, mean, std, lo, hi, corr, float(ymean))
+
 class DetectorProtocol(Protocol):
     """检测器接口协议"""
     def detect(self, df: pd.DataFrame, target: str, time_col: Optional[str] = None, **kwargs) -> List[RiskItem]:
@@ -40,27 +284,35 @@ class TargetLeakageDetector(BaseDetector):
     
     def detect(self, df: pd.DataFrame, target: str, time_col: Optional[str] = None, **kwargs) -> List[RiskItem]:
         risks: List[RiskItem] = []
+        n = len(df.index)
         y = df[target].values
-        num_cols = df.select_dtypes(include=[np.number]).columns.tolist()
-        if target in num_cols:
-            num_cols.remove(target)
+        num_cols = kwargs.get("num_cols")
+        num_cols = [c for c in (num_cols if num_cols is not None else numeric_columns(df)) if c != target]
+        nunq = kwargs.get("nunique")
+        # 单值列（常数或全缺失）不可能与目标相关，不进入相关性扫描
+        scan_cols = num_cols if nunq is None else [c for c in num_cols if nunq[c] > 1]
         suspicious: List[Tuple[str, float]] = []
-        for c in num_cols:
-            x = df[c].values
-            if np.std(x) == 0: continue
+        summary: Optional[NumericSummary] = kwargs.get("numeric_summary")
+        if not scan_cols:
+            corrs = np.empty(0)
+        elif n < 30:
+            # 样本不足时相关系数不可靠，只检查目标列的精确副本（行数少，逐列比较代价可忽略）
+            corrs = np.array([1.0 if np.array_equal(df[c].values, y) else 0.0 for c in scan_cols])
+        elif summary is not None and all(c in summary.positions for c in scan_cols):
+            corrs = summary.corr[[summary.positions[c] for c in scan_cols]]
+        else:
             try:
-                corr = np.corrcoef(x, y)[0, 1]
-            except Exception:
-                continue
-            if np.isfinite(corr) and abs(corr) >= 0.98:
-                suspicious.append((c, float(corr)))
-        for c in num_cols:
-            x = df[[c]].values
-            if np.std(x) == 0: continue
-            lr = LinearRegression().fit(x, y)
-            r2 = lr.score(x, y)
-            if np.isfinite(r2) and r2 >= 0.98 and (c, r2) not in suspicious:
-                suspicious.append((c, float(r2)))
+                corrs = column_correlations(df, scan_cols, y, screen_threshold=0.98)
+            except (TypeError, ValueError):
+                corrs = np.full(len(scan_cols), np.nan)  # 目标列非数值
+        for i in np.flatnonzero(np.abs(corrs) >= 0.98):
+            # 单变量OLS的R²即corr²，无需逐列拟合回归；R²≥0.98时证据记录R²
+            corr = float(corrs[i])
+            # 目标列的精确副本直接记为1.0，不受浮点舍入影响（仅对已命中的少数列比较）
+            if np.array_equal(df[scan_cols[i]].values, y):
+                corr = 1.0
+            r2 = corr * corr
+            suspicious.append((scan_cols[i], r2 if r2 >= 0.98 else corr))
         if suspicious:
             details = {c: v for c, v in suspicious}
             risks.append(RiskItem(
@@ -70,17 +322,27 @@ class TargetLeakageDetector(BaseDetector):
                 evidence={"columns": details},
                 leak_score=0.9
             ))
+        if n < 20:  # 没有类别能达到纯度检查的最小样本数
+            return risks
         # categorical purity
-        cat_cols = [c for c in df.columns if c not in num_cols + [target]]
+        skip = set(num_cols)
+        skip.add(target)
+        cat_cols = [c for c in df.columns if c not in skip]
         purity_hits = {}
+        max_card = max(10, int(n * 0.01))
         for c in cat_cols:
-            vc = df[c].value_counts(dropna=False)
-            if len(vc) < max(10, int(len(df) * 0.01)):
-                grp = df.groupby(c)[target].mean()
-                sizes = df.groupby(c)[target].size()
-                for k, p in grp.items():
-                    if sizes[k] >= 20 and (p <= 0.02 or p >= 0.98):
-                        purity_hits.setdefault(c, []).append({"value": str(k), "p": float(p), "n": int(sizes[k])})
+            if (nunq[c] if nunq is not None else df[c].nunique(dropna=False)) < max_card:
+                # 一次groupby同时得到均值与样本数，再向量化筛选纯净类别
+                # （不对全部分组排序、不展开未出现的类别；只对命中的少数类别排序以保持输出顺序）
+                g = df.groupby(c, observed=True, sort=False)[target].agg(["mean", "size"])
+                hits = g[(g["size"] >= 20) & ((g["mean"] <= 0.02) | (g["mean"] >= 0.98))]
+                if len(hits):
+                    hits = hits.sort_index()
+                    purity_hits[c] = pd.DataFrame({
+                        "value": hits.index.astype(str),
+                        "p": hits["mean"].to_numpy(dtype=np.float64),
+                        "n": hits["size"].to_numpy(dtype=np.int64),
+                    }).to_dict(orient="records")
         if purity_hits:
             risks.append(RiskItem(
                 name="Target leakage (categorical purity)",
@@ -100,79 +362,68 @@ class StatisticalLeakageDetector(BaseDetector):
         """检测TE/WOE/滚动统计类泄漏"""
         risks: List[RiskItem] = []
         
+        # 单独调用（未经注册表）时统计摘要只计算一次，三类检测共用，而非各自重新扫描数值列
+        summary = kwargs.get("numeric_summary")
+        if summary is None:
+            summary = summarize_numeric(df, target)
+        
         # 1. 检测TE/WOE特征
-        te_woe_risks = self._detect_te_woe_leakage(df, target, time_col)
+        te_woe_risks = self._detect_te_woe_leakage(df, target, time_col, summary)
         risks.extend(te_woe_risks)
         
         # 2. 检测滚动统计泄漏
-        rolling_risks = self._detect_rolling_stat_leakage(df, target, time_col)
+        rolling_risks = self._detect_rolling_stat_leakage(df, target, time_col, kwargs.get("parsed_time"), summary)
         risks.extend(rolling_risks)
         
         # 3. 检测聚合痕迹
-        aggregation_risks = self._detect_aggregation_traces(df, target, time_col)
+        aggregation_risks = self._detect_aggregation_traces(df, target, time_col, summary)
         risks.extend(aggregation_risks)
         
         return risks
     
-    def _detect_te_woe_leakage(self, df: pd.DataFrame, target: str, time_col: Optional[str] = None) -> List[RiskItem]:
+    def _detect_te_woe_leakage(self, df: pd.DataFrame, target: str, time_col: Optional[str] = None,
+                               summary: Optional[NumericSummary] = None) -> List[RiskItem]:
         """检测目标编码和WOE泄漏"""
         risks: List[RiskItem] = []
-        y = df[target].values
+        if summary is None:
+            summary = summarize_numeric(df, target)
+        target_mean = summary.target_mean
         
-        # 检测疑似TE/WOE特征
-        te_suspects = {}
-        woe_suspects = {}
-        
-        num_cols = df.select_dtypes(include=[np.number]).columns.tolist()
-        if target in num_cols:
-            num_cols.remove(target)
-        if time_col and time_col in num_cols:
-            num_cols.remove(time_col)
-        
-        for col in num_cols:
-            x = df[col].values
-            if np.std(x) == 0: continue
-            
-            # 检查列名模式
-            col_lower = col.lower()
-            is_te_pattern = any(pattern in col_lower for pattern in ['_te', '_target_enc', 'target_encoding'])
-            is_woe_pattern = any(pattern in col_lower for pattern in ['_woe', 'woe_', 'weight_of_evidence'])
-            
-            # 检查值域特征
-            target_mean = np.mean(y)
-            is_te_like = (np.min(x) >= 0 and np.max(x) <= 1) or (abs(np.mean(x) - target_mean) < 0.1)
-            is_woe_like = np.min(x) < -2 and np.max(x) > 2  # WOE通常有较大范围
-            
-            # 检查与目标的相关性
-            try:
-                corr = np.corrcoef(x, y)[0, 1]
-                if not np.isfinite(corr):
-                    continue
-            except Exception:
-                continue
-            
-            leak_score = 0.0
-            evidence = {"correlation": float(corr), "mean": float(np.mean(x)), "target_mean": float(target_mean)}
-            
-            # TE特征检测
-            if (is_te_pattern or is_te_like) and abs(corr) >= 0.3:
-                leak_score += 0.4
-                if is_te_pattern:
-                    leak_score += 0.3
-                if abs(corr) >= 0.7:
-                    leak_score += 0.3
-                
-                te_suspects[col] = {**evidence, "leak_score": leak_score}
-            
-            # WOE特征检测
-            if (is_woe_pattern or is_woe_like) and abs(corr) >= 0.3:
-                leak_score += 0.4
-                if is_woe_pattern:
-                    leak_score += 0.3
-                if abs(corr) >= 0.7:
-                    leak_score += 0.3
-                
-                woe_suspects[col] = {**evidence, "leak_score": leak_score}
+        # 检测疑似TE/WOE特征：名称模式逐列判断，值域与相关性条件在共享统计摘要上整块计算
+        idx = np.array([i for i, col in enumerate(summary.columns) if col != time_col], dtype=np.intp)
+        names = [summary.columns[i].lower() for i in idx]
+        is_te_pattern = np.array([any(p in c for p in ['_te', '_target_enc', 'target_encoding']) for c in names], dtype=bool)
+        is_woe_pattern = np.array([any(p in c for p in ['_woe', 'woe_', 'weight_of_evidence']) for c in names], dtype=bool)
+        x_min, x_max, x_mean, corr = summary.min[idx], summary.max[idx], summary.mean[idx], summary.corr[idx]
+        
+        # 常数列或相关系数无效（含缺失值）时跳过
+        valid = (x_min != x_max) & np.isfinite(corr)
+        abs_corr = np.abs(corr)
+        related = valid & (abs_corr >= 0.3)
+        strong = np.where(abs_corr >= 0.7, 0.3, 0.0)
+        
+        # 检查值域特征
+        is_te_like = ((x_min >= 0) & (x_max <= 1)) | (np.abs(x_mean - target_mean) < 0.1)
+        is_woe_like = (x_min < -2) & (x_max > 2)  # WOE通常有较大范围
+        
+        # TE特征检测；WOE得分在TE得分基础上累加
+        te_hit = related & (is_te_pattern | is_te_like)
+        te_scores = np.where(te_hit, 0.4 + np.where(is_te_pattern, 0.3, 0.0) + strong, 0.0)
+        woe_hit = related & (is_woe_pattern | is_woe_like)
+        woe_scores = te_scores + 0.4 + np.where(is_woe_pattern, 0.3, 0.0) + strong
+        
+        def _suspects(hit: np.ndarray, scores: np.ndarray) -> Dict[str, Dict]:
+            return {
+                summary.columns[idx[k]]: {
+                    "correlation": float(corr[k]),
+                    "mean": float(x_mean[k]),
+                    "target_mean": float(target_mean),
+                    "leak_score": float(scores[k])
+                }
+                for k in np.flatnonzero(hit)
+            }
+        te_suspects = _suspects(te_hit, te_scores)
+        woe_suspects = _suspects(woe_hit, woe_scores)
         
         # 生成风险项
         if te_suspects:
@@ -197,7 +448,9 @@ class StatisticalLeakageDetector(BaseDetector):
         
         return risks
     
-    def _detect_rolling_stat_leakage(self, df: pd.DataFrame, target: str, time_col: Optional[str] = None) -> List[RiskItem]:
+    def _detect_rolling_stat_leakage(self, df: pd.DataFrame, target: str, time_col: Optional[str] = None,
+                                     parsed_time: Optional[pd.Series] = None,
+                                     summary: Optional[NumericSummary] = None) -> List[RiskItem]:
         """检测滚动统计泄漏"""
         risks: List[RiskItem] = []
         
@@ -206,63 +459,51 @@ class StatisticalLeakageDetector(BaseDetector):
         
         # 检查时间列
         try:
-            t = pd.to_datetime(df[time_col], errors="coerce")
+            t = parsed_time if parsed_time is not None else pd.to_datetime(df[time_col], errors="coerce")
             if t.isna().any():
                 return risks
         except Exception:
             return risks
         
-        # 检测疑似滚动统计特征
-        rolling_suspects = {}
-        num_cols = df.select_dtypes(include=[np.number]).columns.tolist()
-        if target in num_cols:
-            num_cols.remove(target)
-        if time_col in num_cols:
-            num_cols.remove(time_col)
-        
-        for col in num_cols:
-            col_lower = col.lower()
-            is_rolling_pattern = any(pattern in col_lower for pattern in [
-                'rolling_', '_rolling', 'rolling_', 'moving_', '_moving', 'window_', '_window'
-            ])
-            
-            if not is_rolling_pattern:
-                continue
-            
-            x = df[col].values
-            if np.std(x) == 0: continue
-            
-            # 检查是否跨越未来时点（简单启发式）
-            # 如果特征值在时间序列中变化过于平滑，可能使用了未来信息
-            time_sorted_idx = t.argsort()
-            x_sorted = x[time_sorted_idx]
-            
-            # 计算平滑度（相邻值的差异）
-            diffs = np.abs(np.diff(x_sorted))
-            smoothness = 1.0 - (np.std(diffs) / (np.mean(np.abs(x_sorted)) + 1e-8))
-            
-            # 检查与目标的相关性
-            try:
-                corr = np.corrcoef(x, y)[0, 1]
-                if not np.isfinite(corr):
-                    continue
-            except Exception:
-                continue
-            
-            leak_score = 0.0
-            if is_rolling_pattern:
-                leak_score += 0.3
-            if smoothness > 0.8:  # 过于平滑
-                leak_score += 0.4
-            if abs(corr) >= 0.5:
-                leak_score += 0.3
-            
-            if leak_score >= 0.5:
-                rolling_suspects[col] = {
-                    "correlation": float(corr),
-                    "smoothness": float(smoothness),
-                    "leak_score": leak_score
-                }
+        if summary is None:
+            summary = summarize_numeric(df, target)
+        
+        # 检测疑似滚动统计特征：按命名模式取列，相关系数取自共享统计摘要
+        rolling_patterns = ['rolling_', '_rolling', 'moving_', '_moving', 'window_', '_window']
+        idx = np.array([i for i, col in enumerate(summary.columns)
+                        if col != time_col and any(p in col.lower() for p in rolling_patterns)], dtype=np.intp)
+        corr = summary.corr[idx]
+        # 常数列或相关系数无效（含缺失值）时跳过
+        idx_valid = np.flatnonzero((summary.min[idx] != summary.max[idx]) & np.isfinite(corr))
+        if len(idx_valid) == 0:
+            return risks
+        idx, corr = idx[idx_valid], corr[idx_valid]
+        cols = [summary.columns[i] for i in idx]
+        
+        # 检查是否跨越未来时点（简单启发式）：特征值按时间排序后变化过于平滑，可能使用了未来信息
+        # 时间排序索引与列无关，只计算一次（稳定排序，时间相同时保持原顺序）；候选列整块按该顺序取出
+        time_sorted_idx = np.argsort(t.values, kind="mergesort")
+        X = _column_block(df, cols)
+        
+        # 计算平滑度（相邻值的差异）；安装 numba 时按排序索引就地读取，一次遍历完成
+        col_smoothness = _kernels().col_smoothness
+        if col_smoothness is not None and len(X) > 1:
+            smoothness = col_smoothness(np.ascontiguousarray(X.T), time_sorted_idx)
+        else:
+            X_sorted = X[time_sorted_idx]
+            diffs = np.abs(np.diff(X_sorted, axis=0))
+            smoothness = 1.0 - (diffs.std(axis=0) / (np.abs(X_sorted).mean(axis=0) + 1e-8))
+        
+        # 命中滚动统计命名模式 0.3，过于平滑 +0.4，与目标相关 +0.3
+        leak_scores = 0.3 + np.where(smoothness > 0.8, 0.4, 0.0) + np.where(np.abs(corr) >= 0.5, 0.3, 0.0)
+        rolling_suspects = {
+            cols[k]: {
+                "correlation": float(corr[k]),
+                "smoothness": float(smoothness[k]),
+                "leak_score": float(leak_scores[k])
+            }
+            for k in np.flatnonzero(leak_scores >= 0.5)
+        }
         
         if rolling_suspects:
             max_score = max(item["leak_score"] for item in rolling_suspects.values())
@@ -276,56 +517,35 @@ class StatisticalLeakageDetector(BaseDetector):
         
         return risks
     
-    def _detect_aggregation_traces(self, df: pd.DataFrame, target: str, time_col: Optional[str] = None) -> List[RiskItem]:
+    def _detect_aggregation_traces(self, df: pd.DataFrame, target: str, time_col: Optional[str] = None,
+                                   summary: Optional[NumericSummary] = None) -> List[RiskItem]:
         """检测聚合痕迹"""
         risks: List[RiskItem] = []
+        if summary is None:
+            summary = summarize_numeric(df, target)
         
-        # 检测疑似聚合统计特征
-        agg_suspects = {}
-        num_cols = df.select_dtypes(include=[np.number]).columns.tolist()
-        if target in num_cols:
-            num_cols.remove(target)
-        if time_col and time_col in num_cols:
-            num_cols.remove(time_col)
-        
-        for col in num_cols:
-            col_lower = col.lower()
-            is_agg_pattern = any(pattern in col_lower for pattern in [
-                '_mean', '_avg', '_std', '_max', '_min', '_sum', '_count', '_median',
-                'mean_', 'avg_', 'std_', 'max_', 'min_', 'sum_', 'count_', 'median_'
-            ])
-            
-            if not is_agg_pattern:
-                continue
-            
-            x = df[col].values
-            if np.std(x) == 0: continue
-            
-            # 检查变异系数（聚合统计通常变异较小）
-            cv = np.std(x) / (np.mean(x) + 1e-8)
-            
-            # 检查与目标的相关性
-            try:
-                corr = np.corrcoef(x, y)[0, 1]
-                if not np.isfinite(corr):
-                    continue
-            except Exception:
-                continue
-            
-            leak_score = 0.0
-            if is_agg_pattern:
-                leak_score += 0.3
-            if cv < 0.1:  # 变异系数很小
-                leak_score += 0.4
-            if abs(corr) >= 0.3:
-                leak_score += 0.3
-            
-            if leak_score >= 0.5:
-                agg_suspects[col] = {
-                    "correlation": float(corr),
-                    "cv": float(cv),
-                    "leak_score": leak_score
-                }
+        # 检测疑似聚合统计特征：按命名模式取列，基于共享统计摘要整块计算变异系数与得分
+        agg_patterns = [
+            '_mean', '_avg', '_std', '_max', '_min', '_sum', '_count', '_median',
+            'mean_', 'avg_', 'std_', 'max_', 'min_', 'sum_', 'count_', 'median_'
+        ]
+        idx = np.array([i for i, col in enumerate(summary.columns)
+                        if col != time_col and any(p in col.lower() for p in agg_patterns)], dtype=np.intp)
+        corr = summary.corr[idx]
+        cv = summary.cv[idx]  # 聚合统计通常变异较小
+        # 常数列或相关系数无效（含缺失值）时跳过
+        valid = (summary.min[idx] != summary.max[idx]) & np.isfinite(corr)
+        # 命中聚合统计命名模式 0.3，变异系数很小 +0.4，与目标相关 +0.3
+        leak_scores = 0.3 + np.where(cv < 0.1, 0.4, 0.0) + np.where(np.abs(corr) >= 0.3, 0.3, 0.0)
+        hits = np.flatnonzero(valid & (leak_scores >= 0.5))
+        agg_suspects = {
+            summary.columns[idx[k]]: {
+                "correlation": float(corr[k]),
+                "cv": float(cv[k]),
+                "leak_score": float(leak_scores[k])
+            }
+            for k in hits
+        }
         
         if agg_suspects:
             max_score = max(item["leak_score"] for item in agg_suspects.values())
@@ -347,13 +567,16 @@ class KFoldGroupLeakageDetector(BaseDetector):
     def detect(self, df: pd.DataFrame, target: str, time_col: Optional[str] = None, **kwargs) -> List[RiskItem]:
         risks: List[RiskItem] = []
         n = len(df)
-        group_candidates = []
-        for c in df.columns:
-            if c == target: continue
-            nunique = df[c].nunique(dropna=False)
-            if 1 < nunique < n * 0.2:
-                dup_rate = 1 - nunique / n
-                group_candidates.append({"column": c, "nunique": int(nunique), "dup_rate": float(dup_rate)})
+        if n < 10:  # 数据太少，无法判断重复结构
+            return risks
+        # 一次性计算各列 nunique（对结果去掉目标列，避免 drop 复制整表），再向量化筛选
+        nunq = kwargs.get("nunique")
+        if nunq is None:
+            nunq = df.nunique(dropna=False)
+        nunq = nunq.drop(target, errors="ignore")
+        candidates = nunq[(nunq > 1) & (nunq < n * 0.2)]
+        group_candidates = [{"column": c, "nunique": int(v), "dup_rate": float(1 - v / n)}
+                            for c, v in candidates.items()]
         if group_candidates:
             risks.append(RiskItem(
                 name="KFold leakage risk (use GroupKFold)",
@@ -375,7 +598,9 @@ class TimeColumnIssuesDetector(BaseDetector):
         if time_col not in df.columns:
             risks.append(RiskItem("Time column missing", "high", f"时间列 `{time_col}` 不存在。", {}, 0.9))
             return risks
-        t = pd.to_datetime(df[time_col], errors="coerce")
+        t = kwargs.get("parsed_time")
+        if t is None:
+            t = pd.to_datetime(df[time_col], errors="coerce")
         miss = int(t.isna().sum())
         if miss > 0:
             risks.append(RiskItem("Time parse errors", "medium", f"`{time_col}` 有 {miss} 个无效值。", {"invalid": miss}, 0.7))
@@ -397,16 +622,14 @@ class CVConsistencyDetector(BaseDetector):
         # 分析数据特征，给出 CV 建议
         n = len(df)
         has_time = time_col and time_col in df.columns
-        has_groups = False
-        group_cols = []
         
-        # 检查是否有明显的分组结构
-        for c in df.columns:
-            if c == target or c == time_col: continue
-            nunique = df[c].nunique(dropna=False)
-            if 1 < nunique < n * 0.2:  # 高重复率，可能需要分组
-                has_groups = True
-                group_cols.append(c)
+        # 检查是否有明显的分组结构：高重复率的列可能需要分组（按列顺序向量化筛选）
+        nunq = kwargs.get("nunique")
+        if nunq is None:
+            nunq = df.nunique(dropna=False)
+        nunq = nunq.drop([target, time_col], errors="ignore")
+        group_cols = nunq.index[(nunq > 1) & (nunq < n * 0.2)].tolist()
+        has_groups = bool(group_cols)
         
         # 根据数据特征推荐 CV 策略
         recommended_cv = None
@@ -470,28 +693,69 @@ class DetectorRegistry:
             CVConsistencyDetector(),
         ]
     
-    def run_all_detectors(self, df: pd.DataFrame, target: str, time_col: Optional[str] = None, **kwargs) -> Dict:
-        """运行所有检测器"""
-        all_risks = []
-        for detector in self.detectors:
+    def run_all_detectors(self, df: pd.DataFrame, target: str, time_col: Optional[str] = None,
+                          n_jobs: int = 1, **kwargs) -> Dict:
+        """运行所有检测器
+        
+        共享的统计量预先计算一次；各检测器只读数据框，n_jobs != 1 时以线程并发执行（NumPy/pandas 运算释放GIL），
+        结果按检测器注册顺序合并。
+        """
+        if kwargs.get("num_cols") is None:
+            # 按类型筛选列只做一次
+            kwargs["num_cols"] = numeric_columns(df)
+        if kwargs.get("nunique") is None:
+            # 各列唯一值个数只计算一次，供目标泄漏、KFold分组与CV一致性检测共用；
+            # 失败时（如含列表等不可哈希值的列）交由各检测器自行计算，错误按检测器隔离记录
+            try:
+                kwargs["nunique"] = count_unique(df)
+            except (TypeError, ValueError):
+                kwargs["nunique"] = None
+        if kwargs.get("numeric_summary") is None:
+            # 数值块只遍历一次，统计结果由各检测器共享；目标列非数值时各检测器自行处理
+            # 单值列（常数或全缺失）会被所有数值检测跳过，不必读取
+            # 重复列名时按列名取值得到的是数据框而非单列，不做共享计算，交由各检测器自行处理（错误按检测器隔离）
+            nunq = kwargs["nunique"]
+            kwargs["numeric_summary"] = None
+            if df.columns.is_unique:
+                varying = kwargs["num_cols"] if nunq is None else [c for c in kwargs["num_cols"] if nunq[c] > 1]
+                try:
+                    kwargs["numeric_summary"] = summarize_numeric(df, target, num_cols=varying)
+                except (TypeError, ValueError, KeyError):
+                    pass
+        if kwargs.get("parsed_time") is None:
+            # 时间列只解析一次，时间列检测与滚动统计检测共用
+            kwargs["parsed_time"] = parse_time_column(df, time_col)
+        
+        def _run(detector: BaseDetector) -> List[RiskItem]:
             try:
-                risks = detector.detect(df, target, time_col, **kwargs)
-                all_risks.extend(risks)
+                return detector.detect(df, target, time_col, **kwargs)
             except Exception as e:
                 # 检测器出错时记录但不中断
-                all_risks.append(RiskItem(
+                return [RiskItem(
                     name=f"Detector error: {detector.name}",
                     severity="low",
                     detail=f"检测器 {detector.name} 执行出错: {str(e)}",
                     evidence={"error": str(e)},
                     leak_score=0.0
-                ))
+                )]
         
-        return {"risks": [r.to_dict() for r in all_risks]}
+        if n_jobs == 1:
+            results = [_run(d) for d in self.detectors]
+        else:
+            results = parallel_apply(_run, self.detectors, n_jobs=n_jobs, backend="threading")
+        return {"risks": [r.to_dict() for risks in results for r in risks]}
 
 # 保持向后兼容的接口
-def run_checks(df: pd.DataFrame, target: str, time_col: Optional[str] = None, cv_type: Optional[str] = None) -> Dict:
-    """向后兼容的检测接口"""
+def run_checks(df: pd.DataFrame, target: str, time_col: Optional[str] = None, cv_type: Optional[str] = None,
+               parsed_time: Optional[pd.Series] = None, numeric_summary: Optional[NumericSummary] = None,
+               nunique: Optional[pd.Series] = None, n_jobs: int = 1) -> Dict:
+    """向后兼容的检测接口
+    
+    parsed_time 为预先解析的时间列；numeric_summary 为预先计算（如流式计算）的数值统计摘要；
+    nunique 为预先计算的各列唯一值个数（df.nunique(dropna=False)）。
+    未提供时由注册表统一计算一次后共享给各检测器。n_jobs 为检测器并发线程数（-1 为自动）。
+    """
     registry = DetectorRegistry()
-    return registry.run_all_detectors(df, target, time_col, cv_type=cv_type)
+    return registry.run_all_detectors(df, target, time_col, n_jobs=n_jobs, cv_type=cv_type, parsed_time=parsed_time,
+                                      numeric_summary=numeric_summary, nunique=nunique)
 
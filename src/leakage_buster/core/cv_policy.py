@@ -2,10 +2,38 @@
 from __future__ import annotations
 import yaml
 import os
+import copy
+from collections import OrderedDict
 from typing import Dict, List, Optional, Any, Tuple
 from dataclasses import dataclass
 import pandas as pd
 
+# 优先使用 LibYAML 的 C 实现；未编译 LibYAML 时回退纯 Python 的 SafeLoader
+try:
+    from yaml import CSafeLoader as _SafeLoader
+except ImportError:
+    from yaml import SafeLoader as _SafeLoader
+
+# 已解析的策略文件：绝对路径 -> (mtime_ns, size, 解析结果)，按最近使用淘汰
+_POLICY_CACHE: "OrderedDict[str, Tuple[int, int, Any]]" = OrderedDict()
+_POLICY_CACHE_SIZE = 100
+
+def _read_policy_yaml(path: str) -> Any:
+    """解析策略YAML；文件修改时间与大小未变时复用缓存，返回深拷贝以免调用方修改缓存内容"""
+    st = os.stat(path)
+    key = os.path.abspath(path)
+    hit = _POLICY_CACHE.get(key)
+    if hit is not None and hit[0] == st.st_mtime_ns and hit[1] == st.st_size:
+        _POLICY_CACHE.move_to_end(key)
+        return copy.deepcopy(hit[2])
+    with open(path, 'r', encoding='utf-8') as f:
+        data = yaml.load(f, Loader=_SafeLoader)
+    _POLICY_CACHE[key] = (st.st_mtime_ns, st.st_size, data)
+    _POLICY_CACHE.move_to_end(key)
+    if len(_POLICY_CACHE) > _POLICY_CACHE_SIZE:
+        _POLICY_CACHE.popitem(last=False)
+    return copy.deepcopy(data)
+
 @dataclass
 class CVPolicy:
     """CV策略配置"""
@@ -47,8 +75,7 @@ class CVPolicyAuditor:
             return False
         
         try:
-            with open(self.policy_file, 'r', encoding='utf-8') as f:
-                policy_data = yaml.safe_load(f)
+            policy_data = _read_policy_yaml(self.policy_file)
             
             self.policy = CVPolicy(
                 cv_type=policy_data.get('cv_type', 'kfold'),
@@ -63,8 +90,9 @@ class CVPolicyAuditor:
             print(f"Error loading policy file: {e}")
             return False
     
-    def audit_data(self, df: pd.DataFrame, target: str, time_col: Optional[str] = None) -> Dict:
-        """审计数据是否符合策略"""
+    def audit_data(self, df: pd.DataFrame, target: str, time_col: Optional[str] = None,
+                   parsed_time: Optional[pd.Series] = None, nunique: Optional[pd.Series] = None) -> Dict:
+        """审计数据是否符合策略；nunique 为预先计算的各列唯一值个数（可选）"""
         self.violations = []
         
         if not self.policy:
@@ -75,7 +103,7 @@ class CVPolicyAuditor:
             }
         
         # 1. 检查CV类型匹配
-        self._check_cv_type_match(df, target, time_col)
+        self._check_cv_type_match(df, target, time_col, nunique)
         
         # 2. 检查时间列配置
         self._check_time_column_config(time_col)
@@ -84,7 +112,7 @@ class CVPolicyAuditor:
         self._check_group_columns_config(df)
         
         # 4. 检查数据特征
-        self._check_data_characteristics(df, target, time_col)
+        self._check_data_characteristics(df, target, time_col, parsed_time)
         
         # 5. 检查采样策略
         self._check_sampling_strategy(df, target)
@@ -96,10 +124,11 @@ class CVPolicyAuditor:
             "summary": self._generate_summary()
         }
     
-    def _check_cv_type_match(self, df: pd.DataFrame, target: str, time_col: Optional[str] = None):
+    def _check_cv_type_match(self, df: pd.DataFrame, target: str, time_col: Optional[str] = None,
+                             nunique: Optional[pd.Series] = None):
         """检查CV类型是否匹配数据特征"""
         has_time = time_col and time_col in df.columns
-        has_groups = self._has_group_structure(df, target, time_col)
+        has_groups = self._has_group_structure(df, target, time_col, nunique)
         
         expected_cv = self.policy.cv_type
         recommended_cv = self._recommend_cv_type(has_time, has_groups)
@@ -167,7 +196,8 @@ class CVPolicyAuditor:
                 recommendation="考虑将额外分组列加入策略配置"
             ))
     
-    def _check_data_characteristics(self, df: pd.DataFrame, target: str, time_col: Optional[str]):
+    def _check_data_characteristics(self, df: pd.DataFrame, target: str, time_col: Optional[str],
+                                    parsed_time: Optional[pd.Series] = None):
         """检查数据特征"""
         n_rows = len(df)
         n_cols = len(df.columns)
@@ -185,7 +215,7 @@ class CVPolicyAuditor:
         
         # 检查时间列数据质量
         if time_col and time_col in df.columns:
-            time_series = pd.to_datetime(df[time_col], errors='coerce')
+            time_series = parsed_time if parsed_time is not None else pd.to_datetime(df[time_col], errors='coerce')
             invalid_count = time_series.isna().sum()
             if invalid_count > 0:
                 self.violations.append(PolicyViolation(
@@ -225,16 +255,14 @@ class CVPolicyAuditor:
                 recommendation="配置时间列或更改采样策略"
             ))
     
-    def _has_group_structure(self, df: pd.DataFrame, target: str, time_col: Optional[str]) -> bool:
-        """检查是否有分组结构"""
+    def _has_group_structure(self, df: pd.DataFrame, target: str, time_col: Optional[str],
+                             nunique: Optional[pd.Series] = None) -> bool:
+        """检查是否有分组结构（任一特征列重复率高）"""
         n = len(df)
-        for col in df.columns:
-            if col == target or col == time_col:
-                continue
-            nunique = df[col].nunique(dropna=False)
-            if 1 < nunique < n * 0.2:  # 高重复率
-                return True
-        return False
+        if nunique is None:
+            nunique = df.nunique(dropna=False)
+        nunique = nunique.drop([target, time_col], errors="ignore")
+        return bool(((nunique > 1) & (nunique < n * 0.2)).any())  # 高重复率
     
     def _recommend_cv_type(self, has_time: bool, has_groups: bool) -> str:
         """推荐CV类型"""
@@ -288,10 +316,11 @@ class CVPolicyAuditor:
         }
 
 def audit_cv_policy(df: pd.DataFrame, target: str, time_col: Optional[str] = None, 
-                   policy_file: Optional[str] = None) -> Dict:
+                   policy_file: Optional[str] = None, parsed_time: Optional[pd.Series] = None,
+                   nunique: Optional[pd.Series] = None) -> Dict:
     """审计CV策略的便捷函数"""
     auditor = CVPolicyAuditor(policy_file)
     if policy_file:
         auditor.load_policy()
-    return auditor.audit_data(df, target, time_col)
+    return auditor.audit_data(df, target, time_col, parsed_time, nunique)
 
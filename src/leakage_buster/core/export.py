@@ -1,12 +1,12 @@
 
 from __future__ import annotations
 import os
-import json
 import subprocess
 import sys
 from typing import Dict, List, Optional, Any
 from dataclasses import dataclass
 import pandas as pd
+from .report import write_json
 
 @dataclass
 class SARIFResult:
@@ -20,16 +20,23 @@ class SARIFResult:
 class ReportExporter:
     """报告导出器"""
     
+    # weasyprint 可用性的类级缓存：失败的导入不会进入 sys.modules，缓存后每个进程只探测一次
+    _weasyprint_probe: Optional[bool] = None
+    
     def __init__(self):
         self.weasyprint_available = self._check_weasyprint()
     
     def _check_weasyprint(self) -> bool:
-        """检查weasyprint是否可用"""
-        try:
-            import weasyprint
-            return True
-        except ImportError:
-            return False
+        """检查weasyprint是否可用（结果按类缓存）"""
+        cls = type(self)
+        if cls._weasyprint_probe is None:
+            try:
+                import weasyprint
+                cls._weasyprint_probe = True
+            except (ImportError, OSError):
+                # OSError: 包已安装但缺少 cairo/Pango 等系统库
+                cls._weasyprint_probe = False
+        return cls._weasyprint_probe
     
     def export_pdf(self, html_file: str, output_file: str) -> Dict:
         """导出PDF报告"""
@@ -73,8 +80,7 @@ class ReportExporter:
             # 确保输出目录存在
             os.makedirs(os.path.dirname(output_file), exist_ok=True)
             
-            with open(output_file, 'w', encoding='utf-8') as f:
-                json.dump(sarif_data, f, ensure_ascii=False, indent=2)
+            write_json(output_file, sarif_data)
             
             return {
                 "status": "success",
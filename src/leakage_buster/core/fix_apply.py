@@ -6,31 +6,39 @@ from typing import Dict, List, Optional
 from .fix_plan import FixPlan, FixAction
 
 def apply_fixes(df: pd.DataFrame, fix_plan: FixPlan, target: str, time_col: Optional[str] = None) -> pd.DataFrame:
-    """应用修复计划到数据框"""
-    df_fixed = df.copy()
-    
+    """应用修复计划到数据框（不修改传入的 df，返回新数据框）"""
     # 记录修复操作
     applied_fixes = []
     
-    # 1. 删除高危泄漏列
+    # 1. 删除高危泄漏列：先汇总保留列，再一次性投影，避免整表复制与逐列drop
+    present_cols = set(df.columns)
+    delete_cols = set()
     for item in fix_plan.delete_columns:
-        if item.column in df_fixed.columns:
-            df_fixed = df_fixed.drop(columns=[item.column])
+        if item.column in present_cols and item.column not in delete_cols:
+            delete_cols.add(item.column)
             applied_fixes.append({
                 "action": "delete",
                 "column": item.column,
                 "reason": item.reason,
                 "confidence": item.confidence
             })
+    # 无列删除时只做浅复制：重算列以整列赋值替换、不原地写入，原数据不受影响
+    df_fixed = df.loc[:, [c for c in df.columns if c not in delete_cols]] if delete_cols else df.copy(deep=False)
     
     # 2. 重算目标编码特征（示例实现）
+    present_cols -= delete_cols
+    # 时间顺序只计算一次，供各重算列复用（稳定排序，时间相同时保持原顺序）
+    time_order = None
+    if fix_plan.recalculate_columns and time_col and time_col in present_cols:
+        # 经由Series排序以沿用pandas的缺失值处理（NaN排在末尾），取得位置顺序
+        time_order = pd.Series(df_fixed[time_col].to_numpy()).sort_values(kind="mergesort").index.to_numpy()
     for item in fix_plan.recalculate_columns:
-        if item.column in df_fixed.columns:
+        if item.column in present_cols:
             # 这里只是示例，实际应该根据具体特征类型重算
             if "target_enc" in item.column.lower() or "te_" in item.column.lower():
                 # 示例：简单的目标编码重算（实际应该用CV内数据）
                 df_fixed[item.column] = _recalculate_target_encoding(
-                    df_fixed, item.column, target, time_col
+                    df_fixed, item.column, target, time_col, time_order
                 )
                 applied_fixes.append({
                     "action": "recalculate",
@@ -41,7 +49,7 @@ def apply_fixes(df: pd.DataFrame, fix_plan: FixPlan, target: str, time_col: Opti
             elif "rolling" in item.column.lower() or "moving" in item.column.lower():
                 # 示例：滚动统计重算（仅使用历史数据）
                 df_fixed[item.column] = _recalculate_rolling_stats(
-                    df_fixed, item.column, time_col
+                    df_fixed, item.column, time_col, time_order
                 )
                 applied_fixes.append({
                     "action": "recalculate",
@@ -56,12 +64,13 @@ def apply_fixes(df: pd.DataFrame, fix_plan: FixPlan, target: str, time_col: Opti
     
     return df_fixed
 
-def _recalculate_target_encoding(df: pd.DataFrame, col: str, target: str, time_col: Optional[str] = None) -> pd.Series:
+def _recalculate_target_encoding(df: pd.DataFrame, col: str, target: str, time_col: Optional[str] = None,
+                                 time_order: Optional[np.ndarray] = None) -> pd.Series:
     """重算目标编码（示例实现）"""
     # 这是一个简化的示例，实际应该使用CV内数据
     if time_col and time_col in df.columns:
         # 时间感知的目标编码
-        df_sorted = df.sort_values(time_col)
+        df_sorted = _sort_by_time(df, time_col, time_order)
         result = df_sorted.groupby(col)[target].transform('mean')
     else:
         # 简单的目标编码
@@ -69,11 +78,12 @@ def _recalculate_target_encoding(df: pd.DataFrame, col: str, target: str, time_c
     
     return result
 
-def _recalculate_rolling_stats(df: pd.DataFrame, col: str, time_col: Optional[str] = None) -> pd.Series:
+def _recalculate_rolling_stats(df: pd.DataFrame, col: str, time_col: Optional[str] = None,
+                               time_order: Optional[np.ndarray] = None) -> pd.Series:
     """重算滚动统计（示例实现）"""
     if time_col and time_col in df.columns:
         # 时间感知的滚动统计
-        df_sorted = df.sort_values(time_col)
+        df_sorted = _sort_by_time(df, time_col, time_order)
         if "avg" in col.lower() or "mean" in col.lower():
             # 滚动平均
             base_col = col.replace("rolling_", "").replace("_avg", "").replace("_mean", "")
@@ -88,6 +98,12 @@ def _recalculate_rolling_stats(df: pd.DataFrame, col: str, time_col: Optional[st
     
     return result
 
+def _sort_by_time(df: pd.DataFrame, time_col: str, time_order: Optional[np.ndarray] = None) -> pd.DataFrame:
+    """按时间列排序；已给出预计算的位置顺序时直接复用"""
+    if time_order is None:
+        return df.sort_values(time_col, kind="mergesort")
+    return df.iloc[time_order]
+
 def get_fix_summary(fix_plan: FixPlan) -> Dict:
     """获取修复摘要"""
     return {
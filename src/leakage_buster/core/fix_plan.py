@@ -1,6 +1,6 @@
 
 from __future__ import annotations
-from pydantic import BaseModel, Field
+from dataclasses import dataclass, field, asdict
 from typing import List, Dict, Any, Optional
 from enum import Enum
 
@@ -11,41 +11,50 @@ class FixAction(str, Enum):
     RECOMMEND_CV = "recommend_cv"
     RECOMMEND_GROUPS = "recommend_groups"
 
-class FixItem(BaseModel):
-    """单个修复项"""
+@dataclass
+class FixItem:
+    """单个修复项（每列每个风险一项，使用轻量 dataclass，构造时只校验置信度范围）"""
     action: FixAction
     column: str
     reason: str
     evidence: Dict[str, Any]
     risk_source: str  # 来源风险项名称
     severity: str  # high, medium, low
-    confidence: float = Field(ge=0.0, le=1.0)  # 置信度
+    confidence: float  # 置信度，0~1
     details: Optional[str] = None
+    
+    def __post_init__(self):
+        if not 0.0 <= self.confidence <= 1.0:
+            raise ValueError(f"confidence must be within [0, 1], got {self.confidence}")
+    
+    def to_dict(self): return asdict(self)
 
-class FixPlan(BaseModel):
+@dataclass
+class FixPlan:
     """修复计划"""
-    version: str = "1.0"
     total_risks: int
     high_risk_items: int
     medium_risk_items: int
     low_risk_items: int
     
-    # 修复项列表
-    delete_columns: List[FixItem] = Field(default_factory=list)
-    recalculate_columns: List[FixItem] = Field(default_factory=list)
-    cv_recommendations: List[FixItem] = Field(default_factory=list)
-    group_recommendations: List[FixItem] = Field(default_factory=list)
-    
     # 元数据
     created_at: str
     source_file: str
     target_column: str
     time_column: Optional[str] = None
+    version: str = "1.0"
+    
+    # 修复项列表
+    delete_columns: List[FixItem] = field(default_factory=list)
+    recalculate_columns: List[FixItem] = field(default_factory=list)
+    cv_recommendations: List[FixItem] = field(default_factory=list)
+    group_recommendations: List[FixItem] = field(default_factory=list)
+    
+    def to_dict(self): return asdict(self)
     
-    class Config:
-        json_encoders = {
-            # 自定义JSON编码器
-        }
+    def model_dump(self) -> Dict[str, Any]:
+        """与早期 pydantic 版本兼容的别名，等价于 to_dict()"""
+        return self.to_dict()
 
 def create_fix_plan(risks: List[Dict], source_file: str, target: str, time_col: Optional[str] = None) -> FixPlan:
     """从风险列表创建修复计划"""
@@ -0,0 +1,154 @@
+
+from __future__ import annotations
+import functools
+import threading
+import numpy as np
+
+try:
+    import numba
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+prange = numba.prange if NUMBA_AVAILABLE else range
+
+def _col_corrs_impl(X: np.ndarray, y: np.ndarray) -> np.ndarray:
+    """逐列计算与 y 的 Pearson 相关系数
+
+    X 为列优先（SoA）布局，形状 (C, N)，每列在内存中连续；两遍扫描（先均值后中心化累加）保证数值稳定。
+    常数列返回 0，含缺失值的列返回 NaN。
+    """
+    C, N = X.shape
+    out = np.empty(C)
+    y_mean = 0.0
+    for i in range(N):
+        y_mean += y[i]
+    y_mean /= N
+    syy = 0.0
+    for i in range(N):
+        d = y[i] - y_mean
+        syy += d * d
+    for c in prange(C):
+        first = X[c, 0]
+        constant = True
+        x_mean = 0.0
+        for i in range(N):
+            v = X[c, i]
+            x_mean += v
+            if v != first:
+                constant = False
+        if constant:
+            out[c] = 0.0
+            continue
+        x_mean /= N
+        sxx = 0.0
+        sxy = 0.0
+        for i in range(N):
+            d = X[c, i] - x_mean
+            sxx += d * d
+            sxy += d * (y[i] - y_mean)
+        out[c] = sxy / np.sqrt(sxx * syy)
+    return out
+
+def _col_stats_impl(X: np.ndarray, y: np.ndarray) -> np.ndarray:
+    """逐列计算均值、标准差、最小值、最大值及与 y 的相关系数，一次遍历共享给多个检测器
+
+    X 为 (C, N) 列优先布局；返回形状 (5, C)，各行依次为 mean/std/min/max/corr。
+    std 为总体标准差（与 np.std 一致）；常数列 corr 为 0，含缺失值的列各项均为 NaN。
+    """
+    C, N = X.shape
+    out = np.empty((5, C))
+    y_mean = 0.0
+    for i in range(N):
+        y_mean += y[i]
+    y_mean /= N
+    syy = 0.0
+    for i in range(N):
+        d = y[i] - y_mean
+        syy += d * d
+    for c in prange(C):
+        lo = X[c, 0]
+        hi = X[c, 0]
+        x_mean = 0.0
+        has_nan = False
+        for i in range(N):
+            v = X[c, i]
+            x_mean += v
+            if v != v:
+                has_nan = True
+            elif v < lo:
+                lo = v
+            elif v > hi:
+                hi = v
+        if has_nan:
+            for k in range(5):
+                out[k, c] = np.nan
+            continue
+        x_mean /= N
+        sxx = 0.0
+        sxy = 0.0
+        for i in range(N):
+            d = X[c, i] - x_mean
+            sxx += d * d
+            sxy += d * (y[i] - y_mean)
+        out[0, c] = x_mean
+        out[1, c] = np.sqrt(sxx / N)
+        out[2, c] = lo
+        out[3, c] = hi
+        out[4, c] = 0.0 if lo == hi else sxy / np.sqrt(sxx * syy)
+    return out
+
+def _col_smoothness_impl(X: np.ndarray, order: np.ndarray) -> np.ndarray:
+    """按 order 给定的行顺序（时间排序）逐列计算平滑度 1 - std(|Δx|) / (mean(|x|) + 1e-8)
+
+    X 为 (C, N) 列优先布局；按索引读取，无需物化排序后的矩阵及差分、绝对值临时数组。
+    std 为总体标准差（与 np.std 一致）；含缺失值的列返回 NaN。
+    """
+    C, N = X.shape
+    M = N - 1
+    out = np.empty(C)
+    for c in prange(C):
+        abs_sum = 0.0
+        d_sum = 0.0
+        prev = X[c, order[0]]
+        for i in range(N):
+            v = X[c, order[i]]
+            abs_sum += abs(v)
+            if i > 0:
+                d_sum += abs(v - prev)
+            prev = v
+        d_mean = d_sum / M
+        d_var = 0.0
+        prev = X[c, order[0]]
+        for i in range(1, N):
+            v = X[c, order[i]]
+            e = abs(v - prev) - d_mean
+            d_var += e * e
+            prev = v
+        out[c] = 1.0 - np.sqrt(d_var / M) / (abs_sum / N + 1e-8)
+    return out
+
+# numba 并行内核不可被多个 Python 线程同时调用（workqueue 线程层检测到并发访问会直接中止进程），
+# 检测器并发执行时以全局锁串行化内核调用；内核自身已在各列上并行，串行调用不损失吞吐
+_KERNEL_LOCK = threading.Lock()
+
+def _serialized(kernel):
+    """包装内核：调用期间持有 _KERNEL_LOCK"""
+    @functools.wraps(kernel, updated=())
+    def call(*args):
+        with _KERNEL_LOCK:
+            return kernel(*args)
+    
+    return call
+
+if NUMBA_AVAILABLE:
+    # 不开启 nnan/ninf 等快速数学假设，保留缺失值的 NaN 传播；reassoc 允许向量化累加
+    # error_model="numpy"：除零得到 NaN/inf 而非抛出 ZeroDivisionError（目标列为常数时）
+    _jit = numba.njit(parallel=True, cache=True, error_model="numpy", fastmath={"reassoc", "contract"})
+    col_corrs = _serialized(_jit(_col_corrs_impl))
+    col_stats = _serialized(_jit(_col_stats_impl))
+    col_smoothness = _serialized(_jit(_col_smoothness_impl))
+else:
+    col_corrs = None
+    col_stats = None
+    col_smoothness = None
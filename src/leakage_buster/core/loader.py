@@ -2,11 +2,13 @@
 from __future__ import annotations
 import pandas as pd
 import numpy as np
-from typing import Optional, Union, Dict, Any, Tuple
+from typing import Optional, Union, Dict, Any, Tuple, List
 import psutil
 import gc
+import os
+import hashlib
+import datetime
 import warnings
-from pathlib import Path
 
 try:
     import polars as pl
@@ -14,36 +16,142 @@ try:
 except ImportError:
     POLARS_AVAILABLE = False
 
+try:
+    import pyarrow
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+# pandas的pyarrow引擎仅支持部分read_csv参数
+_PYARROW_CSV_KWARGS = {"sep", "delimiter", "header", "names", "usecols", "dtype",
+                       "na_values", "true_values", "false_values", "skiprows", "encoding"}
+
+# 解析缓存默认目录（仅在显式启用缓存时使用，见 CLI --cache）
+DEFAULT_CACHE_DIR = os.path.join(
+    os.environ.get("XDG_CACHE_HOME", os.path.expanduser("~/.cache")), "leakage-buster"
+)
+# 解析缓存最多保留的文件数，超出时按最近使用时间淘汰（LRU）
+CACHE_MAX_ENTRIES = 16
+
+def read_csv_fast(file_path: str, **kwargs) -> pd.DataFrame:
+    """读取CSV，优先使用pyarrow多线程解析，不可用时回退到C引擎
+    
+    pyarrow 的结果按C引擎的类型规范化，两种引擎得到的数据框一致：
+    - 日期/时间戳文本会被推断为 datetime64 或 datetime.date 对象，这些列由C引擎按原始文本重新读取（只转换这些列）；
+    - object 列的缺失值为 None，统一为 NaN；
+    - 只有表头的文件各列为 float64（C引擎为 object），改由C引擎读取。
+    """
+    if PYARROW_AVAILABLE and set(kwargs) <= _PYARROW_CSV_KWARGS:
+        try:
+            df = pd.read_csv(file_path, engine="pyarrow", **kwargs)
+        except (ImportError, pyarrow.ArrowInvalid):
+            pass
+        else:
+            if len(df.index):
+                return _normalize_pyarrow_frame(df, file_path, kwargs)
+    kwargs.setdefault("low_memory", False)
+    return pd.read_csv(file_path, **kwargs)
+
+def _normalize_pyarrow_frame(df: pd.DataFrame, file_path: str, kwargs: Dict[str, Any]) -> pd.DataFrame:
+    """将pyarrow读取结果规范为C引擎的类型：日期/时间列恢复为原始字符串，object列缺失值统一为NaN"""
+    cols = []
+    for c in df.columns:
+        s = df[c]
+        if s.dtype.kind == "M":
+            cols.append(c)
+        elif s.dtype == object:
+            i = s.first_valid_index()
+            if i is not None and isinstance(s.loc[i], (datetime.date, datetime.time)):
+                cols.append(c)
+            elif s.hasnans:
+                df[c] = s.where(s.notna(), np.nan)
+    if not cols:
+        return df
+    
+    # pandas 的pyarrow引擎在推断之后才套用dtype（时间戳已被规范化），原始文本只能由C引擎读取
+    dtype = kwargs.get("dtype")
+    dtype = dict(dtype) if isinstance(dtype, dict) else {}
+    dtype.update({c: object for c in cols})
+    text = pd.read_csv(file_path, low_memory=False, **{**kwargs, "usecols": cols, "dtype": dtype})
+    for c in cols:
+        df[c] = text[c].to_numpy()
+    return df
+
 class DataLoader:
     """数据加载器，支持pandas和polars引擎"""
     
     def __init__(self, engine: str = "pandas", memory_cap_mb: int = 4096, 
-                 chunk_size: int = 10000, sample_ratio: Optional[float] = None):
+                 chunk_size: int = 10000, sample_ratio: Optional[float] = None,
+                 cache_dir: Optional[str] = None):
         self.engine = engine
         self.memory_cap_mb = memory_cap_mb
         self.chunk_size = chunk_size
         self.sample_ratio = sample_ratio
+        self.cache_dir = cache_dir
         
         if engine == "polars" and not POLARS_AVAILABLE:
             warnings.warn("Polars not available, falling back to pandas")
             self.engine = "pandas"
     
-    def load_data(self, file_path: str, **kwargs) -> Union[pd.DataFrame, pl.DataFrame]:
-        """加载数据文件"""
-        file_size_mb = Path(file_path).stat().st_size / (1024 * 1024)
+    def load_data(self, file_path: str, file_stat: Optional[os.stat_result] = None,
+                  **kwargs) -> Union[pd.DataFrame, pl.DataFrame]:
+        """加载数据文件；file_stat 为调用方已取得的 os.stat 结果，提供时不再重复 stat"""
+        st = file_stat if file_stat is not None else os.stat(file_path)
+        file_size_mb = st.st_size / (1024 * 1024)
         
         # 检查文件大小
         if file_size_mb > self.memory_cap_mb * 0.8:  # 留20%缓冲
             return self._load_large_file(file_path, **kwargs)
         else:
-            return self._load_small_file(file_path, **kwargs)
+            return self._load_small_file(file_path, st, **kwargs)
     
-    def _load_small_file(self, file_path: str, **kwargs) -> Union[pd.DataFrame, pl.DataFrame]:
+    def _load_small_file(self, file_path: str, file_stat: Optional[os.stat_result] = None,
+                         **kwargs) -> Union[pd.DataFrame, pl.DataFrame]:
         """加载小文件"""
         if self.engine == "polars":
             return pl.read_csv(file_path, **kwargs)
-        else:
-            return pd.read_csv(file_path, **kwargs)
+        
+        # 仅缓存完整解析的结果（无额外读取参数）
+        cache_path = self._cache_path(file_path, file_stat) if not kwargs else None
+        if cache_path and os.path.exists(cache_path):
+            try:
+                df = pd.read_parquet(cache_path)
+                os.utime(cache_path)  # 刷新修改时间，作为LRU的最近使用时间
+                return df
+            except Exception:
+                pass
+        
+        df = read_csv_fast(file_path, **kwargs)
+        if cache_path:
+            try:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                df.to_parquet(cache_path, compression="zstd", index=False)
+                self._evict_cache()
+            except Exception as e:
+                warnings.warn(f"Failed to write parquet cache: {e}")
+        return df
+    
+    def _evict_cache(self, max_entries: int = CACHE_MAX_ENTRIES) -> None:
+        """缓存文件数超过上限时，按修改时间（最近使用时间）删除最旧的缓存文件"""
+        with os.scandir(self.cache_dir) as it:
+            entries = [e for e in it if e.name.endswith(".parquet") and e.is_file()]
+        if len(entries) <= max_entries:
+            return
+        entries.sort(key=lambda e: e.stat().st_mtime_ns)
+        for e in entries[:len(entries) - max_entries]:
+            try:
+                os.remove(e.path)
+            except OSError:
+                pass
+    
+    def _cache_path(self, file_path: str, file_stat: Optional[os.stat_result] = None) -> Optional[str]:
+        """计算解析缓存路径，键为文件绝对路径+修改时间+大小"""
+        if not self.cache_dir or not PYARROW_AVAILABLE:
+            return None
+        st = file_stat if file_stat is not None else os.stat(file_path)
+        raw = f"{os.path.abspath(file_path)}:{st.st_mtime_ns}:{st.st_size}"
+        key = hashlib.blake2b(raw.encode(), digest_size=8).hexdigest()
+        return os.path.join(self.cache_dir, f"{key}.parquet")
     
     def _load_large_file(self, file_path: str, **kwargs) -> Union[pd.DataFrame, pl.DataFrame]:
         """加载大文件，使用分块或采样策略"""
@@ -61,9 +169,12 @@ class DataLoader:
             sample_size = int(n_rows * self.sample_ratio)
             return df.sample(sample_size, seed=42)
         else:
-            # Pandas采样
-            df = pd.read_csv(file_path, **kwargs)
-            return df.sample(frac=self.sample_ratio, random_state=42)
+            # Pandas采样：逐块解析、逐块抽样，只保留抽中的行，峰值内存约为采样结果加一个分块
+            # 各块内按原文件顺序保留，行索引为其在文件中的位置
+            rng = np.random.default_rng(42)
+            samples = [chunk.sample(frac=self.sample_ratio, random_state=rng).sort_index()
+                       for chunk in read_csv_chunks(file_path, self.chunk_size, **kwargs)]
+            return pd.concat(samples) if samples else read_csv_fast(file_path, nrows=0, **kwargs)
     
     def _load_chunked(self, file_path: str, **kwargs) -> Union[pd.DataFrame, pl.DataFrame]:
         """分块加载"""
@@ -146,12 +257,34 @@ class DataLoader:
 
 def load_data(file_path: str, engine: str = "pandas", memory_cap_mb: int = 4096,
               chunk_size: int = 10000, sample_ratio: Optional[float] = None,
+              cache_dir: Optional[str] = None, file_stat: Optional[os.stat_result] = None,
               **kwargs) -> Union[pd.DataFrame, pl.DataFrame]:
     """加载数据的便捷函数"""
-    loader = DataLoader(engine, memory_cap_mb, chunk_size, sample_ratio)
-    df = loader.load_data(file_path, **kwargs)
+    loader = DataLoader(engine, memory_cap_mb, chunk_size, sample_ratio, cache_dir)
+    df = loader.load_data(file_path, file_stat, **kwargs)
     return loader.optimize_dataframe(df)
 
+def read_csv_columns(file_path: str) -> List[str]:
+    """仅读取CSV表头，返回列名列表"""
+    return pd.read_csv(file_path, nrows=0).columns.tolist()
+
+def read_csv_chunks(file_path: str, chunksize: int, **kwargs):
+    """按块迭代读取CSV，用于流式统计"""
+    return pd.read_csv(file_path, chunksize=chunksize, **kwargs)
+
+def count_lines(file_path: str, chunk_bytes: int = 1 << 20) -> int:
+    """按二进制块统计文件行数（末行无换行符时也计入），不解码、不逐行构造字符串"""
+    lines = 0
+    last = b"\n"
+    with open(file_path, "rb") as f:
+        while True:
+            buf = f.read(chunk_bytes)
+            if not buf:
+                break
+            lines += buf.count(b"\n")
+            last = buf[-1:]
+    return lines + (last != b"\n")
+
 def estimate_memory_usage(file_path: str, sample_rows: int = 1000) -> Dict[str, Any]:
     """估算文件内存使用情况"""
     # 读取样本数据
@@ -160,11 +293,11 @@ def estimate_memory_usage(file_path: str, sample_rows: int = 1000) -> Dict[str,
     # 估算内存使用
     sample_memory = sample_df.memory_usage(deep=True).sum()
     
-    # 获取文件总行数
-    with open(file_path, 'r') as f:
-        total_rows = sum(1 for line in f) - 1  # 减去标题行
+    # 获取文件总行数（减去标题行）
+    total_rows = count_lines(file_path) - 1
     
-    estimated_memory = (sample_memory / sample_rows) * total_rows
+    # 文件不足 sample_rows 行时按实际样本行数折算
+    estimated_memory = (sample_memory / max(len(sample_df), 1)) * total_rows
     
     return {
         "estimated_memory_mb": estimated_memory / (1024 * 1024),
@@ -1,8 +1,97 @@
 
 import os, json, datetime as dt
+from string import Template
 from typing import Dict, Optional
 from jinja2 import Environment, FileSystemLoader, select_autoescape
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# 修复脚本模板（string.Template 的 $ 占位符，脚本内的 f-string 花括号无需转义）
+_FIX_SCRIPT_TEMPLATE = Template('''#!/usr/bin/env python3
+"""
+Leakage Buster 修复建议脚本
+自动生成于: $generated_at
+"""
+
+import pandas as pd
+import numpy as np
+from sklearn.model_selection import GroupKFold, TimeSeriesSplit
+
+# 建议使用GroupKFold的列（apply_fixes 与 get_recommended_cv_splitter 共用）
+GROUP_COLS = $group_cols
+
+def apply_fixes(df: pd.DataFrame, target: str, time_col: str = None):
+    """应用修复建议（不修改传入的 df；drop 返回新数据框，无需预先整表复制）"""
+    df_fixed = df
+
+    # 1. 删除高危泄漏列
+    drop_cols = [c for c in $drop_cols if c in df_fixed.columns]
+    if drop_cols:
+        print(f'删除高危泄漏列: {drop_cols}')
+        df_fixed = df_fixed.drop(columns=drop_cols)
+
+    # 2. 处理目标编码特征
+    te_cols = $te_cols
+    if te_cols:
+        print(f'发现疑似目标编码特征: {te_cols}')
+        print('建议：在CV内重新计算目标编码，避免使用全量数据')
+
+    # 3. 处理时间窗口特征
+    window_cols = $window_cols
+    if window_cols:
+        print(f'发现疑似全量统计特征: {window_cols}')
+        print('建议：改为仅使用历史窗口数据的统计')
+
+    # 4. 分组列建议
+    group_cols = GROUP_COLS
+    if group_cols:
+        print(f'建议使用GroupKFold的列: {group_cols}')
+
+    return df_fixed
+
+def get_recommended_cv_splitter(df: pd.DataFrame, target: str, time_col: str = None):
+    """获取推荐的CV分割器"""
+    if time_col and time_col in df.columns:
+        return TimeSeriesSplit(n_splits=5)
+    elif GROUP_COLS:
+        return GroupKFold(n_splits=5)
+    else:
+        from sklearn.model_selection import KFold
+        return KFold(n_splits=5, shuffle=True, random_state=42)
+
+if __name__ == '__main__':
+    # 示例用法
+    # df = pd.read_csv('your_data.csv')
+    # df_fixed = apply_fixes(df, 'target_column')
+    # cv_splitter = get_recommended_cv_splitter(df, 'target_column')
+    pass
+''')
+
+def _dumps_json_bytes(obj) -> bytes:
+    """序列化为带缩进的UTF-8 JSON字节串；安装orjson时走快速路径，遇到其不支持的类型回退到标准库"""
+    if ORJSON_AVAILABLE:
+        try:
+            return orjson.dumps(
+                obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+            )
+        except TypeError:
+            pass
+    return json.dumps(obj, ensure_ascii=False, indent=2).encode("utf-8")
+
+def dumps_json(obj) -> str:
+    """序列化为带缩进的JSON字符串（见 _dumps_json_bytes）"""
+    return _dumps_json_bytes(obj).decode("utf-8")
+
+def write_json(path: str, obj) -> str:
+    """将对象以带缩进的JSON写入文件；orjson 输出的字节直接写盘，不经解码与文本层编码"""
+    with open(path, "wb") as f:
+        f.write(_dumps_json_bytes(obj))
+    return path
+
 def render_report(results: Dict, meta: Dict, out_dir: str, simulation_results: Optional[Dict] = None, policy_audit: Optional[Dict] = None):
     # Use relative path to find template directory
     template_path = os.path.join(os.path.dirname(__file__), "..", "templates")
@@ -68,75 +157,22 @@ def write_fix_script(results: Dict, out_dir: str):
         elif risk_name.startswith("CV strategy"):
             suggestions.append("# 建议：检查CV策略是否适合数据特征")
     
-    # 生成修复脚本
-    script_lines = [
-        "#!/usr/bin/env python3",
-        '"""',
-        "Leakage Buster 修复建议脚本",
-        "自动生成于: " + dt.datetime.now().isoformat(),
-        '"""',
-        "",
-        "import pandas as pd",
-        "import numpy as np",
-        "from sklearn.model_selection import GroupKFold, TimeSeriesSplit",
-        "",
-        "def apply_fixes(df: pd.DataFrame, target: str, time_col: str = None):",
-        "    \"\"\"应用修复建议\"\"\"",
-        "    df_fixed = df.copy()",
-        "",
-        "    # 1. 删除高危泄漏列",
-        f"    drop_cols = {drop_cols}",
-        "    if drop_cols:",
-        "        print(f'删除高危泄漏列: {drop_cols}')",
-        "        df_fixed = df_fixed.drop(columns=drop_cols)",
-        "",
-        "    # 2. 处理目标编码特征",
-        f"    te_cols = {te_cols}",
-        "    if te_cols:",
-        "        print(f'发现疑似目标编码特征: {te_cols}')",
-        "        print('建议：在CV内重新计算目标编码，避免使用全量数据')",
-        "",
-        "    # 3. 处理时间窗口特征",
-        f"    window_cols = {window_cols}",
-        "    if window_cols:",
-        "        print(f'发现疑似全量统计特征: {window_cols}')",
-        "        print('建议：改为仅使用历史窗口数据的统计')",
-        "",
-        "    # 4. 分组列建议",
-        f"    group_cols = {group_cols}",
-        "    if group_cols:",
-        "        print(f'建议使用GroupKFold的列: {group_cols}')",
-        "",
-        "    return df_fixed",
-        "",
-        "def get_recommended_cv_splitter(df: pd.DataFrame, target: str, time_col: str = None):",
-        "    \"\"\"获取推荐的CV分割器\"\"\"",
-        "    if time_col and time_col in df.columns:",
-        "        return TimeSeriesSplit(n_splits=5)",
-        "    elif group_cols:",
-        "        return GroupKFold(n_splits=5)",
-        "    else:",
-        "        from sklearn.model_selection import KFold",
-        "        return KFold(n_splits=5, shuffle=True, random_state=42)",
-        "",
-        "if __name__ == '__main__':",
-        "    # 示例用法",
-        "    # df = pd.read_csv('your_data.csv')",
-        "    # df_fixed = apply_fixes(df, 'target_column')",
-        "    # cv_splitter = get_recommended_cv_splitter(df, 'target_column')",
-        "    pass"
-    ]
+    # 生成修复脚本：整段模板一次替换写出
+    script = _FIX_SCRIPT_TEMPLATE.substitute(
+        generated_at=dt.datetime.now().isoformat(),
+        drop_cols=repr(drop_cols),
+        te_cols=repr(te_cols),
+        window_cols=repr(window_cols),
+        group_cols=repr(group_cols),
+    )
     
     with open(path, "w", encoding="utf-8") as f:
-        f.write("\\n".join(script_lines))
+        f.write(script)
     return path
 
 def write_meta(meta: Dict, out_dir: str):
     os.makedirs(out_dir, exist_ok=True)
-    path = os.path.join(out_dir, "meta.json")
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(meta, f, ensure_ascii=False, indent=2)
-    return path
+    return write_json(os.path.join(out_dir, "meta.json"), meta)
 
 def get_fix_summary(results: Dict) -> Dict:
     """提取修复建议摘要"""
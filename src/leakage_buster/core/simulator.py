@@ -3,9 +3,6 @@ from __future__ import annotations
 from typing import Dict, List, Optional, Tuple, Any
 import numpy as np
 import pandas as pd
-from sklearn.model_selection import TimeSeriesSplit, KFold
-from sklearn.linear_model import LogisticRegression
-from sklearn.metrics import roc_auc_score
 import warnings
 
 class TimeSeriesSimulator:
@@ -41,8 +38,8 @@ class TimeSeriesSimulator:
         if not suspicious_cols:
             return {"message": "没有可疑特征需要对比", "comparisons": []}
         
-        # 准备数据
-        X = df[suspicious_cols].values
+        # 准备数据：可疑特征按 (n_samples, n_features) 矩阵整体处理
+        X = df[suspicious_cols].to_numpy(dtype=np.float64)
         y = df[target].values
         
         # 确保数据没有缺失值
@@ -55,16 +52,42 @@ class TimeSeriesSimulator:
         
         comparisons = []
         
-        for col in suspicious_cols:
-            try:
-                comparison = self._compare_single_feature(
-                    df[col].values[valid_mask], y, time_col, col, leak_threshold
-                )
-                if comparison:
-                    comparisons.append(comparison)
-            except Exception as e:
-                warnings.warn(f"对比特征 {col} 时出错: {str(e)}")
-                continue
+        # 常数特征与单一类别目标无法比较，预先以掩码排除
+        keep = np.flatnonzero(X.std(axis=0) > 0) if len(np.unique(y)) >= 2 else np.empty(0, dtype=np.intp)
+        if len(keep):
+            X = X[:, keep]
+            
+            # sklearn 仅在启用时序模拟时才导入，不拖慢 CLI 启动与其余检测
+            from sklearn.model_selection import TimeSeriesSplit, KFold
+            
+            # 两种切分各只生成一次，所有特征在同一组折上整体打分，结果形状 (有效折数, 特征数)
+            ts_scores = self._get_cv_scores(X, y, TimeSeriesSplit(n_splits=self.n_splits))
+            kf_scores = self._get_cv_scores(X, y, KFold(n_splits=self.n_splits, shuffle=True, random_state=self.random_state))
+            
+            if len(ts_scores) and len(kf_scores):
+                ts_mean, kf_mean = ts_scores.mean(axis=0), kf_scores.mean(axis=0)
+                ts_std, kf_std = ts_scores.std(axis=0), kf_scores.std(axis=0)
+                score_diff = kf_mean - ts_mean
+                is_leak = np.abs(score_diff) > leak_threshold
+                comparisons = [
+                    {
+                        "feature": suspicious_cols[col],
+                        "timeseries_cv": {
+                            "scores": ts_scores[:, j].tolist(),
+                            "mean": float(ts_mean[j]),
+                            "std": float(ts_std[j])
+                        },
+                        "kfold_cv": {
+                            "scores": kf_scores[:, j].tolist(),
+                            "mean": float(kf_mean[j]),
+                            "std": float(kf_std[j])
+                        },
+                        "score_difference": float(score_diff[j]),
+                        "is_leak": bool(is_leak[j]),
+                        "leak_severity": self._get_leak_severity(abs(float(score_diff[j])), leak_threshold)
+                    }
+                    for j, col in enumerate(keep)
+                ]
         
         return {
             "message": f"对比了 {len(comparisons)} 个可疑特征",
@@ -72,85 +95,48 @@ class TimeSeriesSimulator:
             "leak_threshold": leak_threshold
         }
     
-    def _compare_single_feature(self, 
-                              feature: np.ndarray, 
-                              target: np.ndarray, 
-                              time_col: Optional[str],
-                              feature_name: str,
-                              leak_threshold: float) -> Optional[Dict]:
-        """对比单个特征的CV策略"""
-        
-        # 检查特征是否有效
-        if np.std(feature) == 0 or len(np.unique(target)) < 2:
-            return None
-        
-        # 准备数据
-        X = feature.reshape(-1, 1)
-        y = target
+    def _get_cv_scores(self, X: np.ndarray, y: np.ndarray, cv_splitter) -> np.ndarray:
+        """获取各折、各特征的验证集AUC，返回形状 (有效折数, 特征数)
         
-        # TimeSeriesSplit结果
-        ts_scores = self._get_cv_scores(X, y, TimeSeriesSplit(n_splits=self.n_splits))
-        
-        # KFold结果
-        kf_scores = self._get_cv_scores(X, y, KFold(n_splits=self.n_splits, shuffle=True, random_state=self.random_state))
-        
-        if not ts_scores or not kf_scores:
-            return None
-        
-        # 计算差异
-        ts_mean = np.mean(ts_scores)
-        kf_mean = np.mean(kf_scores)
-        score_diff = kf_mean - ts_mean
+        每个特征单独拟合的一元逻辑回归（带截距、L2正则）系数符号与训练集上 cov(x, y) 相同，
+        预测概率是 ±x 的单调函数，因此验证集AUC即 x 的秩和AUC（负相关取 1-AUC，无相关为0.5）；
+        按列求秩即可对全部特征一次算出，无需逐特征、逐折拟合模型。训练或验证集只含单一类别的折跳过。
+        """
+        from scipy.stats import rankdata
         
-        # 判断是否泄漏
-        is_leak = abs(score_diff) > leak_threshold
+        classes = np.unique(y)
+        if len(classes) != 2:
+            # AUC只对二分类有定义
+            return np.empty((0, X.shape[1]))
+        pos = y == classes[1]
         
-        return {
-            "feature": feature_name,
-            "timeseries_cv": {
-                "scores": ts_scores,
-                "mean": float(ts_mean),
-                "std": float(np.std(ts_scores))
-            },
-            "kfold_cv": {
-                "scores": kf_scores,
-                "mean": float(kf_mean),
-                "std": float(np.std(kf_scores))
-            },
-            "score_difference": float(score_diff),
-            "is_leak": is_leak,
-            "leak_severity": self._get_leak_severity(abs(score_diff), leak_threshold)
-        }
-    
-    def _get_cv_scores(self, X: np.ndarray, y: np.ndarray, cv_splitter) -> List[float]:
-        """获取CV分数"""
         scores = []
         
         for train_idx, val_idx in cv_splitter.split(X):
             try:
-                X_train, X_val = X[train_idx], X[val_idx]
-                y_train, y_val = y[train_idx], y[val_idx]
+                y_train, y_val = pos[train_idx], pos[val_idx]
+                n_pos = int(y_val.sum())
+                n_neg = len(y_val) - n_pos
                 
                 # 检查训练集和验证集是否有效
-                if len(np.unique(y_train)) < 2 or len(np.unique(y_val)) < 2:
+                if y_train.all() or not y_train.any() or n_pos == 0 or n_neg == 0:
                     continue
                 
-                # 训练模型
-                model = LogisticRegression(random_state=self.random_state, max_iter=1000)
-                model.fit(X_train, y_train)
+                # 训练集协方差符号（目标已中心化，特征无需再中心化）即各特征的系数方向
+                direction = np.sign((y_train - y_train.mean()) @ X[train_idx])
                 
-                # 预测并计算AUC
-                y_pred = model.predict_proba(X_val)[:, 1]
-                auc = roc_auc_score(y_val, y_pred)
+                # Mann-Whitney 秩和AUC，平均秩处理并列值（与 roc_auc_score 一致）
+                ranks = rankdata(X[val_idx], axis=0)
+                auc = (ranks[y_val].sum(axis=0) - n_pos * (n_pos + 1) / 2) / (n_pos * n_neg)
+                auc = np.where(direction > 0, auc, np.where(direction < 0, 1.0 - auc, 0.5))
                 
-                if np.isfinite(auc):
-                    scores.append(auc)
+                scores.append(auc)
                     
             except Exception as e:
                 warnings.warn(f"CV fold计算出错: {str(e)}")
                 continue
         
-        return scores
+        return np.array(scores).reshape(-1, X.shape[1])
     
     def _get_leak_severity(self, score_diff: float, threshold: float) -> str:
         """根据分数差异确定泄漏严重程度"""
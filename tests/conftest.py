@@ -0,0 +1,162 @@
+import pytest
+import pandas as pd
+import numpy as np
+from types import SimpleNamespace
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+def pytest_configure(config):
+    """收集前预先导入被测包（每个进程/xdist worker一次），导入错误在会话开始时即暴露"""
+    import leakage_buster.cli  # noqa: F401
+    import leakage_buster.core.checks  # noqa: F401
+    import leakage_buster.core.cv_policy  # noqa: F401
+    import leakage_buster.core.export  # noqa: F401
+    _warmup_kernels()
+
+def _warmup_kernels():
+    """以极小数组调用各 numba 内核一次（float64 与 float32 两种块类型），JIT编译在会话开始时完成，
+    不计入各测试（尤其是性能测试）的耗时；配合 cache=True，后续会话直接命中磁盘缓存。"""
+    from leakage_buster.core.kernels import col_corrs, col_stats, col_smoothness
+    if col_stats is None:
+        return
+    y = np.array([0.0, 1.0, 0.0, 1.0])
+    order = np.arange(len(y), dtype=np.intp)
+    for dtype in (np.float64, np.float32):
+        X = np.ascontiguousarray(np.vstack([y, y[::-1]]).astype(dtype))
+        col_corrs(X, y)
+        col_stats(X, y)
+        col_smoothness(X, order)
+
+def pytest_addoption(parser):
+    parser.addoption("--slow", action="store_true", default=False,
+                     help="同时运行标记为 slow 的测试（完整CLI流水线等），默认跳过")
+
+def pytest_collection_modifyitems(config, items):
+    """pytest-xdist --dist loadgroup 下按测试类分组：同一类的测试在同一worker上运行，类级夹具只构建一次，
+    不同测试类仍分布到各worker并行。已显式标记 xdist_group 的测试保持原分组。
+    
+    未传 --slow 时跳过标记为 slow 的测试。
+    """
+    skip_slow = None if config.getoption("--slow") else pytest.mark.skip(reason="需要 --slow 选项")
+    for item in items:
+        if skip_slow is not None and "slow" in item.keywords:
+            item.add_marker(skip_slow)
+        if item.cls is not None and item.get_closest_marker("xdist_group") is None:
+            item.add_marker(pytest.mark.xdist_group(name=f"{item.module.__name__}::{item.cls.__name__}"))
+
+# 随机数池：导入时用固定种子生成一次，各测试按长度切片取用，避免反复构造生成器与小数组
+_POOL_SIZE = 10_000
+_POOL_RNG = np.random.default_rng(42)
+_NORMAL = _POOL_RNG.standard_normal(_POOL_SIZE)
+_UNIFORM = _POOL_RNG.random(_POOL_SIZE)
+
+def pooled_normal(n: int, mu: float = 0.0, sd: float = 1.0) -> np.ndarray:
+    """取随机数池前n个标准正态值并缩放为 N(mu, sd²)"""
+    return _NORMAL[:n] * sd + mu
+
+def pooled_binomial(n: int, p: float) -> np.ndarray:
+    """取随机数池前n个均匀值，阈值化为伯努利(p)的0/1整数数组"""
+    return (_UNIFORM[:n] < p).astype(np.int64)
+
+@pytest.fixture(scope="session")
+def rng_pool():
+    """随机数池夹具：rng_pool.normal(n, mu, sd) / rng_pool.binomial(n, p)，n 不超过10000"""
+    return SimpleNamespace(normal=pooled_normal, binomial=pooled_binomial)
+
+@pytest.fixture(scope="session")
+def fast_to_csv():
+    """写CSV的函数夹具：fast_to_csv(df, path)；有pyarrow时走其C++写入器，否则回退到 df.to_csv"""
+    def write(df: pd.DataFrame, path) -> None:
+        if PYARROW_AVAILABLE:
+            pacsv.write_csv(pa.Table.from_pandas(df, preserve_index=False), str(path))
+        else:
+            df.to_csv(path, index=False)
+    
+    return write
+
+def _make_frame(rng: np.random.Generator, n: int, features, target_p: float = 0.3) -> pd.DataFrame:
+    """各特征列（标准正态，float32）由一次 standard_normal((n, k)) 抽取后按列切出，目标列为伯努利(target_p)的uint8
+    
+    紧凑类型同时覆盖检测器对 float32 块与非 int64 目标列的处理路径。
+    """
+    X = rng.standard_normal((n, len(features)), dtype=np.float32)
+    data = {name: X[:, j] for j, name in enumerate(features)}
+    data['y'] = rng.binomial(1, target_p, n).astype(np.uint8)
+    return pd.DataFrame(data, copy=False)
+
+@pytest.fixture(scope="session")
+def small_frame():
+    """100行无泄漏基础数据框：id / feature1 / feature2 / normal_feature / y（固定随机种子）
+    
+    各测试以 df.assign(...) 添加特征列得到新数据框，不修改共享夹具；需要更少行时取 .iloc[:n]。
+    """
+    n = 100
+    df = _make_frame(np.random.default_rng(7), n, ['feature1', 'feature2', 'normal_feature'])
+    df.insert(0, 'id', np.arange(n))
+    return df
+
+@pytest.fixture(scope="session")
+def ts_frame():
+    """100行按天的时间序列数据框：date / feature1 / normal_feature / y（固定随机种子），用法同 small_frame"""
+    n = 100
+    df = _make_frame(np.random.default_rng(11), n, ['feature1', 'normal_feature'])
+    # 按天日期直接由 datetime64 算术生成（等价于 pd.date_range(..., freq='D')，不经 offsets 路径）
+    start = np.datetime64('2023-01-01', 'D')
+    df.insert(0, 'date', np.arange(start, start + n).astype('datetime64[ns]'))
+    return df
+
+@pytest.fixture(scope="session")
+def leak_df():
+    """带目标泄漏列的40行小数据框（固定随机种子；行数足以进行相关性扫描）；各测试共享，需要修改时请先 copy()"""
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        'amount': np.arange(1, 41) * 100,
+        'target': np.tile([0, 1, 0, 1, 0], 8)
+    })
+    df['leak_col'] = df['target'] * 100 + rng.normal(0, 0.1, 40)
+    return df
+
+@pytest.fixture(scope="session")
+def audited_leak(leak_df):
+    """leak_df 的审计、修复计划与修复后数据框，整个会话只计算一次"""
+    from leakage_buster.api import audit, plan_fixes, apply_fixes_to_dataframe
+    audit_result = audit(leak_df, 'target')
+    fix_plan = plan_fixes(audit_result, "test.csv")
+    fixed_df = apply_fixes_to_dataframe(leak_df, fix_plan)
+    return SimpleNamespace(df=leak_df, audit=audit_result, plan=fix_plan, fixed=fixed_df)
+
+@pytest.fixture(scope="session")
+def policy_df():
+    """CV策略测试用数据框工厂：policy_df(n, with_user=False, with_date=True)
+    
+    date（按天）/ user_id（单一用户）/ amount / y 列；数值取自随机数池，相同参数只构建一次，每次返回副本。
+    """
+    cache = {}
+    
+    def make(n: int, with_user: bool = False, with_date: bool = True) -> pd.DataFrame:
+        key = (n, with_user, with_date)
+        if key not in cache:
+            data = {}
+            if with_date:
+                data['date'] = pd.date_range('2023-01-01', periods=n, freq='D')
+            if with_user:
+                data['user_id'] = ['user_001'] * n
+            data['amount'] = pooled_normal(n, 100, 20)
+            data['y'] = pooled_binomial(n, 0.3)
+            cache[key] = pd.DataFrame(data)
+        return cache[key].copy()
+    
+    return make
+
+@pytest.fixture(autouse=True)
+def _isolated_cache_dir(tmp_path, monkeypatch):
+    """磁盘缓存目录指向本测试的临时目录，测试不写入用户的 ~/.cache"""
+    from leakage_buster.core import loader
+    cache_home = tmp_path / "xdg-cache"
+    monkeypatch.setenv("XDG_CACHE_HOME", str(cache_home))
+    monkeypatch.setattr(loader, "DEFAULT_CACHE_DIR", str(cache_home / "leakage-buster"))
@@ -0,0 +1,74 @@
+import pytest
+import pandas as pd
+import numpy as np
+import time
+from types import SimpleNamespace
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+# 性能测试数据集与CSV为会话级夹具：固定随机种子，整个测试会话只生成、写盘一次
+
+@pytest.fixture(scope="session")
+def medium_dataset():
+    """创建中等规模数据集（10-20万行，200+列）"""
+    n_rows = 150000  # 15万行
+    n_cols = 450
+    n_random = n_cols - 5 - 100  # 减去已创建的列
+    rng = np.random.default_rng(0)
+
+    # 数值列与随机列一次生成为同一个 float32 矩阵，各列为其视图
+    num_block = rng.standard_normal((n_rows, 100 + n_random), dtype=np.float32)
+
+    # 类别列：整数编码一次生成，再按编码构造 Categorical，不对字符串列表逐行抽样
+    categories = [f'cat_{j}' for j in range(10)]
+    codes = rng.integers(0, 10, size=(n_rows, 50), dtype=np.int8)
+    cats = pd.DataFrame({f'cat_{i}': pd.Categorical.from_codes(codes[:, i], categories=categories)
+                         for i in range(50)})
+
+    # 时间列与目标列
+    target = rng.binomial(1, 0.3, n_rows).astype(np.int8)
+    base = pd.DataFrame({
+        'date': pd.date_range('2020-01-01', periods=n_rows, freq='1H'),
+        'target': target,
+        # 一些泄漏列
+        'leak_1': target + np.float32(0.01) * rng.standard_normal(n_rows, dtype=np.float32),
+        'leak_2': target * np.float32(100) + np.float32(0.1) * rng.standard_normal(n_rows, dtype=np.float32),
+    })
+
+    return pd.concat([
+        pd.DataFrame(num_block[:, :100], columns=[f'num_{i}' for i in range(100)], copy=False),
+        cats,
+        base,
+        # 更多随机列
+        pd.DataFrame(num_block[:, 100:], columns=[f'random_{i}' for i in range(100, 100 + n_random)], copy=False),
+    ], axis=1)
+
+@pytest.fixture(scope="session")
+def temp_csv(medium_dataset, tmp_path_factory):
+    """创建临时CSV文件（整个测试会话只写一次，结束后删除）"""
+    path = tmp_path_factory.mktemp("perf") / "medium.csv"
+    if PYARROW_AVAILABLE:
+        # pyarrow 的多线程 C++ 写入器，避免 pandas 逐单元格格式化
+        pacsv.write_csv(pa.Table.from_pandas(medium_dataset, preserve_index=False), str(path))
+    else:
+        medium_dataset.to_csv(path, index=False)
+    yield str(path)
+    path.unlink(missing_ok=True)
+
+@pytest.fixture(scope="session")
+def audited_medium(temp_csv):
+    """对CSV解析得到的中等规模数据集审计一次，结果与审计耗时供各测试复用
+    
+    CSV解析在计时之外完成（pyarrow可用时多线程解析），计时只覆盖 audit()。
+    """
+    from leakage_buster.api import audit
+    from leakage_buster.core.loader import read_csv_fast
+    df = read_csv_fast(temp_csv)
+    start = time.perf_counter()
+    result = audit(df, target='target', time_col='date', cv_type='timeseries')
+    return SimpleNamespace(result=result, seconds=time.perf_counter() - start)
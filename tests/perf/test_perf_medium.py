@@ -5,7 +5,6 @@ import numpy as np
 import time
 import os
 import sys
-import tempfile
 from pathlib import Path
 
 # 添加src到路径
@@ -16,49 +15,10 @@ from leakage_buster.core.loader import load_data, estimate_memory_usage
 from leakage_buster.core.parallel import ParallelProcessor
 
 @pytest.mark.perf
+@pytest.mark.xdist_group("perf")  # 会话级数据集与CSV每个worker各生成一份，集中到同一worker只生成一次
 class TestPerformanceMedium:
     """中等规模性能测试"""
     
-    @pytest.fixture
-    def medium_dataset(self):
-        """创建中等规模数据集（10-20万行，200+列）"""
-        n_rows = 150000  # 15万行
-        n_cols = 450     # 250列
-        
-        # 创建基础数据
-        data = {}
-        
-        # 数值列
-        for i in range(100):
-            data[f'num_{i}'] = np.random.normal(0, 1, n_rows)
-        
-        # 类别列
-        for i in range(50):
-            data[f'cat_{i}'] = np.random.choice([f'cat_{j}' for j in range(10)], n_rows)
-        
-        # 时间列
-        data['date'] = pd.date_range('2020-01-01', periods=n_rows, freq='1H')
-        
-        # 目标列
-        data['target'] = np.random.binomial(1, 0.3, n_rows)
-        
-        # 一些泄漏列
-        data['leak_1'] = data['target'] + np.random.normal(0, 0.01, n_rows)
-        data['leak_2'] = data['target'] * 100 + np.random.normal(0, 0.1, n_rows)
-        
-        # 更多随机列
-        for i in range(100, n_cols - 5):  # 减去已创建的列
-            data[f'random_{i}'] = np.random.normal(0, 1, n_rows)
-        
-        return pd.DataFrame(data)
-    
-    @pytest.fixture
-    def temp_csv(self, medium_dataset):
-        """创建临时CSV文件"""
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.csv', delete=False) as f:
-            medium_dataset.to_csv(f, index=False)
-            return f.name
-    
     def test_memory_estimation(self, temp_csv):
         """测试内存估算"""
         memory_info = estimate_memory_usage(temp_csv, sample_rows=1000)
@@ -83,18 +43,10 @@ class TestPerformanceMedium:
         
         print(f"Pandas loading time: {load_time:.2f} seconds")
     
-    def test_audit_performance_pandas(self, temp_csv):
+    def test_audit_performance_pandas(self, audited_medium):
         """测试pandas引擎审计性能"""
-        start_time = time.time()
-        
-        audit_result = audit(
-            pd.read_csv(temp_csv), 
-            target='target', 
-            time_col='date',
-            cv_type='timeseries'
-        )
-        
-        audit_time = time.time() - start_time
+        audit_result = audited_medium.result
+        audit_time = audited_medium.seconds
         
         assert audit_result.risk_count >= 0
         assert audit_time < 120  # 2分钟内完成审计
@@ -102,47 +54,57 @@ class TestPerformanceMedium:
         print(f"Pandas audit time: {audit_time:.2f} seconds")
         print(f"Risks detected: {audit_result.risk_count}")
     
-    def test_parallel_processing(self, medium_dataset):
-        """测试并行处理性能"""
-        # 创建测试函数
-        def process_chunk(chunk):
-            return chunk['target'].sum()
-        
-        # 分块数据
-        chunk_size = 10000
-        chunks = [medium_dataset.iloc[i:i+chunk_size] for i in range(0, len(medium_dataset), chunk_size)]
+    @pytest.mark.parametrize('n_jobs,chunk_size', [
+        (1, 50_000),
+        (4, 50_000),
+        (os.cpu_count() or 1, 50_000),
+        (4, 10_000),
+    ])
+    def test_parallel_processing(self, medium_dataset, n_jobs, chunk_size):
+        """测试并行处理性能（按并行数与分块大小参数化，输出各组合的加速比）"""
+        # 各工作线程只接收 (start, stop) 区间，在共享的目标数组上做 NumPy 求和（归约释放GIL），不切分数据框
+        target = medium_dataset['target'].to_numpy()
+        
+        def process_chunk(bounds):
+            start, stop = bounds
+            return int(target[start:stop].sum())
+        
+        # 分块区间
+        chunks = [(i, min(i + chunk_size, len(target))) for i in range(0, len(target), chunk_size)]
         
         # 测试并行处理
-        processor = ParallelProcessor(n_jobs=4, backend='threading')
+        processor = ParallelProcessor(n_jobs=n_jobs, backend='threading')
         
-        start_time = time.time()
+        start_time = time.perf_counter()
         results = processor.parallel_apply(process_chunk, chunks)
-        parallel_time = time.time() - start_time
+        parallel_time = time.perf_counter() - start_time
         
         # 测试串行处理
-        start_time = time.time()
+        start_time = time.perf_counter()
         serial_results = [process_chunk(chunk) for chunk in chunks]
-        serial_time = time.time() - start_time
+        serial_time = time.perf_counter() - start_time
         
         assert len(results) == len(serial_results)
-        assert sum(results) == sum(serial_results)
+        assert sum(results) == sum(serial_results) == int(target.sum())
         
-        print(f"Parallel time: {parallel_time:.2f} seconds")
-        print(f"Serial time: {serial_time:.2f} seconds")
-        print(f"Speedup: {serial_time / parallel_time:.2f}x")
+        # 只输出加速比，不对其断言：单次归约仅微秒级，线程调度开销随机器负载波动
+        print(f"n_jobs={n_jobs} (effective {processor.n_jobs}), chunk_size={chunk_size}")
+        print(f"Parallel time: {parallel_time:.4f} seconds")
+        print(f"Serial time: {serial_time:.4f} seconds")
+        print(f"Speedup: {serial_time / max(parallel_time, 1e-9):.2f}x")
     
     def test_memory_optimization(self, temp_csv):
         """测试内存优化"""
-        # 加载原始数据
-        df_original = pd.read_csv(temp_csv)
-        original_memory = df_original.memory_usage(deep=True).sum() / (1024 * 1024)
+        # 原始数据的内存与形状由抽样估算得到，不再完整解析一遍CSV
+        original_info = estimate_memory_usage(temp_csv, sample_rows=1000)
+        original_memory = original_info['estimated_memory_mb']
         
         # 加载优化数据
         df_optimized = load_data(temp_csv, engine='pandas', memory_cap_mb=4096)
         optimized_memory = df_optimized.memory_usage(deep=True).sum() / (1024 * 1024)
         
-        assert len(df_original) == len(df_optimized)
-        assert len(df_original.columns) == len(df_optimized.columns)
+        assert original_info['total_rows'] == len(df_optimized)
+        assert original_info['columns'] == len(df_optimized.columns)
         
         print(f"Original memory: {original_memory:.2f} MB")
         print(f"Optimized memory: {optimized_memory:.2f} MB")
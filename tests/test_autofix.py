@@ -5,7 +5,6 @@ import numpy as np
 import os
 import sys
 import json
-import tempfile
 
 # 添加src到路径
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
@@ -120,6 +119,29 @@ class TestFixApply:
         # 检查是否有修复元数据
         assert 'leakage_buster_fixes' in fixed_df.attrs
     
+    def test_apply_fixes_does_not_mutate_input(self):
+        """测试无删除列时重算修复不修改原数据框"""
+        df = pd.DataFrame({
+            'target_enc_feature': [0.5, 0.5, 0.7, 0.7],
+            'target': [0, 1, 0, 0]
+        })
+        original = df.copy()
+        risks = [
+            {
+                "name": "Target encoding leakage risk",
+                "severity": "medium",
+                "evidence": {
+                    "suspicious_columns": {"target_enc_feature": {"correlation": 0.85}}
+                }
+            }
+        ]
+        
+        fixed_df = apply_fixes(df, create_fix_plan(risks, "test.csv", "target"), "target")
+        
+        assert fixed_df['target_enc_feature'].tolist() == [0.5, 0.5, 0.0, 0.0]
+        pd.testing.assert_frame_equal(df, original)
+        assert 'leakage_buster_fixes' not in df.attrs
+    
     def test_get_fix_summary(self):
         """测试修复摘要"""
         risks = [
@@ -158,11 +180,11 @@ class TestFixApply:
 class TestAPI:
     """测试API"""
     
-    def test_audit_basic(self):
+    def test_audit_basic(self, rng_pool):
         """测试基础审计"""
         df = pd.DataFrame({
-            'amount': np.random.normal(100, 20, 50),
-            'target': np.random.binomial(1, 0.3, 50)
+            'amount': rng_pool.normal(50, 100, 20),
+            'target': rng_pool.binomial(50, 0.3)
         })
         
         audit_result = audit(df, 'target')
@@ -172,162 +194,127 @@ class TestAPI:
         assert audit_result.risk_count >= 0
         assert not audit_result.has_high_risk  # 随机数据不应该有高危风险
     
-    def test_audit_with_high_correlation(self):
+    def test_risk_counts_follow_risks_list(self):
+        """测试严重程度计数随 risks 列表的修改而更新"""
+        audit_result = AuditResult({"risks": [{"severity": "low"}]}, {})
+        assert not audit_result.has_high_risk
+        
+        audit_result.risks.append({"severity": "high"})
+        assert audit_result.has_high_risk and audit_result.high_risk_count == 1
+        assert audit_result.to_dict()["summary"]["high_risks"] == 1
+    
+    def test_audit_with_high_correlation(self, audited_leak):
         """测试高相关性审计"""
-        df = pd.DataFrame({
-            'amount': [100, 200, 300, 400, 500],
-            'target': [0, 1, 0, 1, 0]
-        })
-        # 创建高相关性
-        df['leak_col'] = df['target'] * 100 + np.random.normal(0, 0.1, 5)
-        
-        audit_result = audit(df, 'target')
+        # 应该对泄漏列报告目标泄漏风险
+        leaks = [r for r in audited_leak.audit.risks if r["name"].startswith("Target leakage")]
+        assert any("leak_col" in r["evidence"]["columns"] for r in leaks)
+    
+    def test_audit_with_unhashable_column(self, policy_df):
+        """测试含列表列时审计不中断，错误按检测器记录"""
+        df = policy_df(50)
+        df['tags'] = [[1, 2]] * len(df)
+        audit_result = audit(df, 'y')
         
-        # 应该检测到高相关性风险
         assert audit_result.risk_count > 0
+        assert any(r['name'].startswith('Detector error') for r in audit_result.risks)
     
-    def test_plan_fixes(self):
+    def test_plan_fixes(self, audited_leak):
         """测试修复计划"""
-        df = pd.DataFrame({
-            'amount': [100, 200, 300, 400, 500],
-            'target': [0, 1, 0, 1, 0]
-        })
-        df['leak_col'] = df['target'] * 100 + np.random.normal(0, 0.1, 5)
-        
-        audit_result = audit(df, 'target')
-        fix_plan = plan_fixes(audit_result, "test.csv")
+        fix_plan = audited_leak.plan
         
         assert isinstance(fix_plan, FixPlan)
         assert fix_plan.total_risks > 0
     
-    def test_apply_fixes_to_dataframe(self):
+    def test_apply_fixes_to_dataframe(self, audited_leak):
         """测试应用修复到数据框"""
-        df = pd.DataFrame({
-            'amount': [100, 200, 300, 400, 500],
-            'target': [0, 1, 0, 1, 0]
-        })
-        df['leak_col'] = df['target'] * 100 + np.random.normal(0, 0.1, 5)
-        
-        audit_result = audit(df, 'target')
-        fix_plan = plan_fixes(audit_result, "test.csv")
-        fixed_df = apply_fixes_to_dataframe(df, fix_plan)
+        fixed_df = audited_leak.fixed
         
         assert isinstance(fixed_df, pd.DataFrame)
-        assert len(fixed_df) == len(df)
+        assert len(fixed_df) == len(audited_leak.df)
         assert 'leakage_buster_fixes' in fixed_df.attrs
 
 class TestCLIIntegration:
     """测试CLI集成"""
     
-    def test_cli_auto_fix_plan(self):
+    @pytest.fixture(scope="class")
+    def leak_csv(self, leak_df, tmp_path_factory):
+        """plan/apply 两个测试共用的泄漏数据CSV（只写一次）"""
+        path = tmp_path_factory.mktemp("cli") / "leak.csv"
+        leak_df.to_csv(path, index=False)
+        return str(path), leak_df
+    
+    def test_cli_auto_fix_plan(self, leak_csv, tmp_path):
         """测试CLI auto-fix plan模式"""
-        df = pd.DataFrame({
-            'amount': [100, 200, 300, 400, 500],
-            'target': [0, 1, 0, 1, 0]
-        })
-        df['leak_col'] = df['target'] * 100 + np.random.normal(0, 0.1, 5)
-        
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.csv', delete=False) as f:
-            df.to_csv(f, index=False)
-            data_file = f.name
-        
-        try:
-            result = run(
-                train_path=data_file,
-                target='target',
-                time_col=None,
-                out_dir='test_plan_output',
-                auto_fix='plan',
-                fix_json='test_plan_output/fix_plan.json'
-            )
-            
-            assert result['status'] == 'success'
-            assert 'fix_plan' in result['data']
-            assert os.path.exists('test_plan_output/fix_plan.json')
-            
-            # 验证修复计划JSON
-            with open('test_plan_output/fix_plan.json', 'r') as f:
-                plan_data = json.load(f)
-            assert 'version' in plan_data
-            assert 'total_risks' in plan_data
-            
-        finally:
-            os.unlink(data_file)
-            if os.path.exists('test_plan_output'):
-                import shutil
-                shutil.rmtree('test_plan_output')
+        data_file, df = leak_csv
+        out_dir = tmp_path / 'out'
+        
+        result = run(
+            train_path=data_file,
+            target='target',
+            time_col=None,
+            out_dir=str(out_dir),
+            auto_fix='plan',
+            fix_json=str(out_dir / 'fix_plan.json')
+        )
+        
+        assert result['status'] == 'success'
+        assert 'fix_plan' in result['data']
+        assert (out_dir / 'fix_plan.json').exists()
+        
+        # 验证修复计划JSON
+        with open(out_dir / 'fix_plan.json', 'r') as f:
+            plan_data = json.load(f)
+        assert 'version' in plan_data
+        assert 'total_risks' in plan_data
     
-    def test_cli_auto_fix_apply(self):
+    def test_cli_auto_fix_apply(self, leak_csv, tmp_path):
         """测试CLI auto-fix apply模式"""
-        df = pd.DataFrame({
-            'amount': [100, 200, 300, 400, 500],
-            'target': [0, 1, 0, 1, 0]
-        })
-        df['leak_col'] = df['target'] * 100 + np.random.normal(0, 0.1, 5)
-        
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.csv', delete=False) as f:
-            df.to_csv(f, index=False)
-            data_file = f.name
-        
-        try:
-            result = run(
-                train_path=data_file,
-                target='target',
-                time_col=None,
-                out_dir='test_apply_output',
-                auto_fix='apply',
-                fixed_train='test_apply_output/fixed_train.csv'
-            )
-            
-            assert result['status'] == 'success'
-            assert os.path.exists('test_apply_output/fixed_train.csv')
-            
-            # 验证修复后的数据
-            fixed_df = pd.read_csv('test_apply_output/fixed_train.csv')
-            assert len(fixed_df) == len(df)
-            assert 'target' in fixed_df.columns
-            
-        finally:
-            os.unlink(data_file)
-            if os.path.exists('test_apply_output'):
-                import shutil
-                shutil.rmtree('test_apply_output')
+        data_file, df = leak_csv
+        out_dir = tmp_path / 'out'
+        
+        result = run(
+            train_path=data_file,
+            target='target',
+            time_col=None,
+            out_dir=str(out_dir),
+            auto_fix='apply',
+            fixed_train=str(out_dir / 'fixed_train.csv')
+        )
+        
+        assert result['status'] == 'success'
+        assert (out_dir / 'fixed_train.csv').exists()
+        
+        # 验证修复后的数据
+        fixed_df = pd.read_csv(out_dir / 'fixed_train.csv')
+        assert len(fixed_df) == len(df)
+        assert 'target' in fixed_df.columns
     
-    def test_cli_exit_codes(self):
+    def test_cli_exit_codes(self, tmp_path, rng_pool):
         """测试CLI退出码"""
         # 测试正常情况
         df = pd.DataFrame({
-            'amount': np.random.normal(100, 20, 50),
-            'target': np.random.binomial(1, 0.3, 50)
+            'amount': rng_pool.normal(50, 100, 20),
+            'target': rng_pool.binomial(50, 0.3)
         })
+        data_file = tmp_path / 'train.csv'
+        df.to_csv(data_file, index=False)
+        
+        result = run(
+            train_path=str(data_file),
+            target='target',
+            time_col=None,
+            out_dir=str(tmp_path / 'out')
+        )
         
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.csv', delete=False) as f:
-            df.to_csv(f, index=False)
-            data_file = f.name
-        
-        try:
-            result = run(
-                train_path=data_file,
-                target='target',
-                time_col=None,
-                out_dir='test_exit_output'
-            )
-            
-            assert result['exit_code'] == EXIT_OK
-            
-        finally:
-            os.unlink(data_file)
-            if os.path.exists('test_exit_output'):
-                import shutil
-                shutil.rmtree('test_exit_output')
+        assert result['exit_code'] == EXIT_OK
     
-    def test_cli_invalid_config(self):
+    def test_cli_invalid_config(self, tmp_path):
         """测试CLI无效配置"""
         result = run(
-            train_path='nonexistent.csv',
+            train_path=str(tmp_path / 'nonexistent.csv'),
             target='target',
             time_col=None,
-            out_dir='test_invalid_output'
+            out_dir=str(tmp_path / 'out')
         )
         
         assert result['status'] == 'error'
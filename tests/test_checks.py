@@ -0,0 +1,202 @@
+import os
+import subprocess
+import sys
+import pytest
+from pathlib import Path
+from leakage_buster.cli import run
+import pandas as pd
+import numpy as np
+
+EXAMPLE_CSV = Path(__file__).parent.parent / "examples" / "synth_train.csv"
+
+def test_column_correlations_match_corrcoef():
+    """测试向量化相关系数与逐列np.corrcoef一致"""
+    from leakage_buster.core.checks import column_correlations
+    n = 300
+    rng = np.random.default_rng(7)
+    y = rng.integers(0, 2, size=n)
+    df = pd.DataFrame({
+        "a": rng.normal(size=n),
+        "b": y + rng.normal(0, 0.05, size=n),
+        "c": rng.integers(0, 10, size=n),
+        "const": np.full(n, 0.1),
+    })
+    corrs = column_correlations(df, ["a", "b", "c", "const"], y, block_size=3)
+    for i, c in enumerate(["a", "b", "c"]):
+        assert np.isclose(corrs[i], np.corrcoef(df[c].values, y)[0, 1])
+    assert corrs[3] == 0.0
+    
+    # 纯Python内核（numba未安装时的参考实现）与结果一致
+    from leakage_buster.core.kernels import _col_corrs_impl
+    X = np.ascontiguousarray(df[["a", "b", "c", "const"]].to_numpy(dtype=np.float64).T)
+    assert np.allclose(_col_corrs_impl(X, y.astype(np.float64)), corrs)
+
+def test_column_correlations_float32_screen(monkeypatch):
+    """测试float32粗筛的阈值判断与float64一致（含大偏移列）"""
+    from leakage_buster.core import checks, kernels
+    monkeypatch.setattr(kernels, "col_corrs", None)
+    n = 2000
+    rng = np.random.default_rng(11)
+    y = rng.integers(0, 2, size=n)
+    df = pd.DataFrame({
+        "noise": rng.normal(size=n),
+        "leak": y + rng.normal(0, 0.05, size=n),
+        "offset_leak": y * 1e12 + 1e18,
+    })
+    cols = list(df.columns)
+    screened = checks.column_correlations(df, cols, y, screen_threshold=0.98)
+    exact = checks.column_correlations(df, cols, y)
+    assert np.array_equal(np.abs(screened) >= 0.98, np.abs(exact) >= 0.98)
+    assert np.allclose(screened[1:], exact[1:])
+
+def test_numeric_summary_matches_numpy(monkeypatch):
+    """测试共享数值统计摘要与逐列NumPy统计一致"""
+    from leakage_buster.core import checks, kernels
+    from leakage_buster.core.kernels import _col_stats_impl
+    n = 500
+    rng = np.random.default_rng(3)
+    y = rng.integers(0, 2, size=n)
+    df = pd.DataFrame({"a": rng.normal(size=n), "b": y * 0.9 + 0.05, "y": y})
+    summary = checks.summarize_numeric(df, "y")
+    assert summary.columns == ["a", "b"]
+    for i, c in enumerate(summary.columns):
+        x = df[c].values
+        assert np.isclose(summary.mean[i], x.mean()) and np.isclose(summary.std[i], x.std())
+        assert summary.min[i] == x.min() and summary.max[i] == x.max()
+        assert np.isclose(summary.corr[i], np.corrcoef(x, y)[0, 1])
+    
+    stats = _col_stats_impl(np.ascontiguousarray(df[["a", "b"]].to_numpy().T), y.astype(np.float64))
+    assert np.allclose(stats, np.vstack([summary.mean, summary.std, summary.min, summary.max, summary.corr]))
+    
+    monkeypatch.setattr(kernels, "col_stats", None)
+    fallback = checks.summarize_numeric(df, "y")
+    assert np.allclose(fallback.corr, summary.corr) and np.allclose(fallback.std, summary.std)
+
+def test_block_stats_raw_moments_with_large_offset():
+    """测试NumPy路径的原始矩计算在均值远大于标准差时回退中心化，结果与np.std/np.corrcoef一致"""
+    from leakage_buster.core.checks import _numpy_block_stats
+    rng = np.random.default_rng(12)
+    y = rng.normal(size=2000)
+    X = np.asfortranarray(np.column_stack([y + rng.normal(size=2000), 1e9 + y + rng.normal(size=2000)]))
+    stats = _numpy_block_stats(X, y)
+    assert np.allclose(stats[1], X.std(axis=0))
+    assert np.allclose(stats[4], [np.corrcoef(X[:, j], y)[0, 1] for j in range(2)])
+
+def test_smoothness_kernel_matches_numpy():
+    """测试平滑度内核（按排序索引读取）与对排序后矩阵的NumPy计算一致"""
+    from leakage_buster.core.kernels import _col_smoothness_impl
+    rng = np.random.default_rng(8)
+    X = np.column_stack([rng.normal(size=300), np.cumsum(rng.normal(size=300)) + 50])
+    order = rng.permutation(300)
+    Xs = X[order]
+    diffs = np.abs(np.diff(Xs, axis=0))
+    expected = 1.0 - diffs.std(axis=0) / (np.abs(Xs).mean(axis=0) + 1e-8)
+    assert np.allclose(_col_smoothness_impl(np.ascontiguousarray(X.T), order), expected)
+
+def test_count_unique_matches_pandas():
+    """测试已排序列的快速计数与 df.nunique(dropna=False) 一致（含缺失值、字符串与混合类型列）"""
+    from leakage_buster.core.checks import count_unique
+    rng = np.random.default_rng(9)
+    df = pd.DataFrame({
+        "ts": pd.date_range("2024-01-01", periods=100, freq="h").repeat(2)[:100],
+        "id": np.sort(rng.integers(0, 30, 100)),
+        "f": np.sort(rng.normal(size=100).round(1)),
+        "nan": np.r_[np.arange(99.0), np.nan],
+        "s": sorted(rng.choice(list("abcde"), 100)),
+        "mixed": [1, "a"] * 50,
+        "x": rng.integers(0, 5, 100),
+    })
+    assert count_unique(df).equals(df.nunique(dropna=False))
+    assert count_unique(df.iloc[:1]).equals(df.iloc[:1].nunique(dropna=False))
+
+def test_exact_target_copy_reported_as_one():
+    """测试目标列的精确副本以corr=1.0报告"""
+    from leakage_buster.core.checks import TargetLeakageDetector
+    n = 200
+    rng = np.random.default_rng(5)
+    y = rng.normal(size=n) * 3.7 + 0.1
+    df = pd.DataFrame({"copy_of_y": y, "noise": rng.normal(size=n), "y": y})
+    risks = TargetLeakageDetector().detect(df, "y")
+    assert risks[0].evidence["columns"] == {"copy_of_y": 1.0}
+
+def test_detectors_skip_tiny_inputs():
+    """测试样本过少或无数值列时检测器直接返回（目标列的精确副本仍然报告）"""
+    from leakage_buster.core.checks import TargetLeakageDetector, KFoldGroupLeakageDetector
+    y = np.arange(8) % 2
+    tiny = pd.DataFrame({"near_y": y * 0.9 + 0.05, "g": [0, 0, 1, 1] * 2, "y": y})
+    assert TargetLeakageDetector().detect(tiny, "y") == []
+    assert KFoldGroupLeakageDetector().detect(tiny, "y") == []
+    
+    tiny["copy_of_y"] = y
+    risks = TargetLeakageDetector().detect(tiny, "y")
+    assert [r.evidence["columns"] for r in risks] == [{"copy_of_y": 1.0}]
+    
+    cats = pd.DataFrame({"c": ["a"] * 40 + ["b"] * 40, "y": [0] * 40 + [1] * 40})
+    risks = TargetLeakageDetector().detect(cats, "y")
+    assert [r.name for r in risks] == ["Target leakage (categorical purity)"]
+
+def test_chunked_numeric_summary(tmp_path: Path):
+    """测试流式数值统计与全量计算一致，且CLI结果不变"""
+    from leakage_buster.core.checks import summarize_numeric, summarize_numeric_chunks
+    n = 1000
+    rng = np.random.default_rng(9)
+    y = rng.integers(0, 2, size=n)
+    df = pd.DataFrame({
+        "date": pd.date_range("2024-01-01", periods=n, freq="h"),
+        "offset": rng.normal(size=n) + 1e6,
+        "leak": y + rng.normal(0, 0.01, size=n),
+        "y": y,
+    })
+    full = summarize_numeric(df, "y")
+    streamed = summarize_numeric_chunks((df.iloc[i:i + 128] for i in range(0, n, 128)), "y")
+    assert streamed.columns == full.columns
+    for field in ["mean", "std", "min", "max", "corr"]:
+        assert np.allclose(getattr(streamed, field), getattr(full, field))
+    
+    csv = tmp_path / "train.csv"
+    df.to_csv(csv, index=False)
+    res_full = run(str(csv), target="y", time_col="date", out_dir=str(tmp_path / "a"))
+    res_chunked = run(str(csv), target="y", time_col="date", out_dir=str(tmp_path / "b"), chunksize=100)
+    assert res_chunked["data"]["summary"] == res_full["data"]["summary"]
+
+def test_checks_import_does_not_load_numba():
+    """测试导入检测模块时不导入numba（内核在首次计算时才加载）"""
+    script = "import sys, leakage_buster.core.checks, leakage_buster.api; assert 'numba' not in sys.modules"
+    proc = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True)
+    assert proc.returncode == 0, proc.stderr
+
+def test_kernels_serialized_under_workqueue():
+    """测试numba内核被多线程并发调用时串行执行：workqueue线程层下进程不被中止"""
+    pytest.importorskip("numba")
+    script = (
+        "import numpy as np\n"
+        "from concurrent.futures import ThreadPoolExecutor\n"
+        "from leakage_buster.core.kernels import col_corrs\n"
+        "X = np.random.default_rng(0).random((16, 50_000)); y = X[0]\n"
+        "with ThreadPoolExecutor(8) as ex: list(ex.map(lambda _: col_corrs(X, y), range(32)))\n"
+    )
+    env = dict(os.environ, NUMBA_THREADING_LAYER="workqueue")
+    proc = subprocess.run([sys.executable, "-c", script], env=env, capture_output=True, text=True)
+    assert proc.returncode == 0, proc.stderr
+
+def test_parallel_detectors_match_sequential():
+    """测试检测器并发执行时结果与顺序执行一致（含顺序）"""
+    from leakage_buster.core.checks import run_checks
+    df = pd.read_csv(EXAMPLE_CSV)
+    assert run_checks(df, "y", "date", n_jobs=4) == run_checks(df, "y", "date", n_jobs=1)
+
+def test_unhashable_column_isolated_per_detector():
+    """测试含不可哈希值（列表）的列不使共享预计算失败，错误按检测器记录"""
+    from leakage_buster.core.checks import run_checks
+    df = pd.DataFrame({"a": np.linspace(0, 1, 50), "tags": [[1, 2]] * 50, "y": [0, 1] * 25})
+    names = [r["name"] for r in run_checks(df, "y")["risks"]]
+    assert names == ["Detector error: target_leakage", "Detector error: kfold_group_leakage",
+                     "Detector error: cv_consistency"]
+
+def test_duplicate_column_names_isolated_per_detector():
+    """测试重复列名不使共享预计算失败，错误按检测器记录"""
+    from leakage_buster.core.checks import run_checks
+    df = pd.DataFrame(np.random.default_rng(0).normal(size=(50, 3)), columns=["a", "a", "y"])
+    df["y"] = [0, 1] * 25
+    names = [r["name"] for r in run_checks(df, "y")["risks"]]
+    assert "Detector error: target_leakage" in names
@@ -0,0 +1,59 @@
+from pathlib import Path
+from leakage_buster.cli import run
+import pandas as pd
+import numpy as np
+
+EXAMPLE_CSV = Path(__file__).parent.parent / "examples" / "synth_train.csv"
+
+def test_usecols_projection(tmp_path: Path):
+    """测试--usecols只加载指定列（自动保留目标列与时间列）"""
+    n = 120
+    rng = np.random.default_rng(4)
+    y = rng.integers(0, 2, size=n)
+    df = pd.DataFrame({
+        "date": pd.date_range("2024-01-01", periods=n, freq="D"),
+        "leak": y + rng.normal(0, 0.01, size=n),
+        "other": rng.normal(size=n),
+        "y": y,
+    })
+    csv = tmp_path / "train.csv"
+    df.to_csv(csv, index=False)
+    res = run(str(csv), target="y", time_col="date", out_dir=str(tmp_path / "out"), usecols=["other"])
+    assert res["data"]["meta"]["n_cols"] == 3
+    assert res["data"]["summary"]["high_risks"] == 0
+    
+    res = run(str(csv), target="y", time_col="date", out_dir=str(tmp_path / "out"), usecols=["nope"])
+    assert res["exit_code"] == 4 and res["error"]["details"]["columns"] == ["nope"]
+
+def test_audit_result_cache(tmp_path: Path, capsys, monkeypatch):
+    """测试审计结果缓存默认关闭；--cache 下输入文件与参数未变时复用，参数变化时重新审计"""
+    out_dir = tmp_path / "out"
+    run(str(EXAMPLE_CSV), target="y", time_col="date", out_dir=str(out_dir))
+    assert not (out_dir / ".cache").exists()
+    
+    first = run(str(EXAMPLE_CSV), target="y", time_col="date", out_dir=str(out_dir), cache=True)
+    assert list((out_dir / ".cache").glob("audit-*.json"))
+    capsys.readouterr()
+    
+    second = run(str(EXAMPLE_CSV), target="y", time_col="date", out_dir=str(out_dir), cache=True)
+    assert "复用审计缓存" in capsys.readouterr().out
+    assert second["data"]["summary"] == first["data"]["summary"]
+    assert second["data"]["meta"]["n_rows"] == first["data"]["meta"]["n_rows"]
+    
+    third = run(str(EXAMPLE_CSV), target="y", time_col="date", out_dir=str(out_dir), cache=True, leak_threshold=0.05)
+    assert "复用审计缓存" not in capsys.readouterr().out
+    assert third["status"] == "success"
+    
+    # 源码摘要变化（检测逻辑更新）时缓存失效
+    from leakage_buster import cli
+    monkeypatch.setattr(cli, "_source_digest", lambda: "changed")
+    run(str(EXAMPLE_CSV), target="y", time_col="date", out_dir=str(out_dir), cache=True)
+    assert "复用审计缓存" not in capsys.readouterr().out
+
+def test_auto_chunksize_for_large_files(tmp_path: Path, monkeypatch):
+    """测试训练文件超过大小阈值时自动启用流式统计"""
+    from leakage_buster import cli
+    monkeypatch.setattr(cli, "AUTO_CHUNK_BYTES", 0)
+    res = run(str(EXAMPLE_CSV), target="y", time_col="date", out_dir=str(tmp_path / "out"))
+    assert res["status"] == "success"
+    assert res["data"]["meta"]["args"]["chunksize"] == cli.AUTO_CHUNKSIZE
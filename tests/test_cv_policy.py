@@ -4,9 +4,7 @@ import pandas as pd
 import numpy as np
 import os
 import sys
-import yaml
 import json
-import tempfile
 
 # 添加src到路径
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
@@ -15,46 +13,63 @@ from leakage_buster.core.cv_policy import CVPolicyAuditor, audit_cv_policy, CVPo
 from leakage_buster.core.export import ReportExporter, export_report
 from leakage_buster.cli import run
 
+try:
+    import weasyprint  # noqa: F401
+    _HAS_WEASY = True
+except (ImportError, OSError):
+    _HAS_WEASY = False
+
+# 测试用策略文件内容：直接写出YAML文本，无需在测试中运行YAML序列化
+_POLICY_TIMESERIES = """cv_type: timeseries
+n_splits: 5
+time_col: date
+group_cols: [user_id]
+sampling_strategy: time_aware
+random_state: 42
+"""
+
+_POLICY_KFOLD = """cv_type: kfold
+n_splits: 5
+time_col: date
+"""
+
 class TestCVPolicyAuditor:
     """测试CV策略审计器"""
     
-    def test_load_policy(self):
+    def test_load_policy(self, tmp_path):
         """测试加载策略文件"""
         # 创建临时策略文件
-        policy_data = {
-            'cv_type': 'timeseries',
-            'n_splits': 5,
-            'time_col': 'date',
-            'group_cols': ['user_id'],
-            'sampling_strategy': 'time_aware',
-            'random_state': 42
-        }
+        policy_file = tmp_path / 'policy.yaml'
+        policy_file.write_text(_POLICY_TIMESERIES)
+        
+        auditor = CVPolicyAuditor()
+        success = auditor.load_policy(str(policy_file))
         
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.yaml', delete=False) as f:
-            yaml.dump(policy_data, f)
-            policy_file = f.name
-        
-        try:
-            auditor = CVPolicyAuditor()
-            success = auditor.load_policy(policy_file)
-            
-            assert success == True
-            assert auditor.policy is not None
-            assert auditor.policy.cv_type == 'timeseries'
-            assert auditor.policy.time_col == 'date'
-            assert auditor.policy.group_cols == ['user_id']
-        finally:
-            os.unlink(policy_file)
+        assert success == True
+        assert auditor.policy is not None
+        assert auditor.policy.cv_type == 'timeseries'
+        assert auditor.policy.time_col == 'date'
+        assert auditor.policy.group_cols == ['user_id']
     
-    def test_audit_data_cv_type_mismatch(self):
+    def test_load_policy_cache(self, tmp_path):
+        """测试策略文件解析缓存：内容未变时复用且互不共享，文件修改后重新解析"""
+        policy_file = tmp_path / 'policy.yaml'
+        policy_file.write_text("cv_type: group\ngroup_cols: [user_id]\n")
+        
+        first, second = CVPolicyAuditor(), CVPolicyAuditor()
+        assert first.load_policy(str(policy_file)) and second.load_policy(str(policy_file))
+        first.policy.group_cols.append('other')
+        assert second.policy.group_cols == ['user_id']
+        
+        policy_file.write_text("cv_type: timeseries\ntime_col: date\n")
+        auditor = CVPolicyAuditor()
+        assert auditor.load_policy(str(policy_file))
+        assert auditor.policy.cv_type == 'timeseries' and auditor.policy.group_cols == []
+    
+    def test_audit_data_cv_type_mismatch(self, policy_df):
         """测试CV类型不匹配检测"""
         # 创建测试数据
-        df = pd.DataFrame({
-            'date': pd.date_range('2023-01-01', periods=50, freq='D'),
-            'user_id': ['user_001'] * 50,
-            'amount': np.random.normal(100, 20, 50),
-            'y': np.random.binomial(1, 0.3, 50)
-        })
+        df = policy_df(50, with_user=True)
         
         # 创建策略（要求kfold但数据有时序特征）
         policy = CVPolicy(
@@ -79,13 +94,9 @@ class TestCVPolicyAuditor:
         assert len(cv_violations) > 0
         assert cv_violations[0]['severity'] == 'high'  # 时间数据用KFold是严重错误
     
-    def test_audit_data_missing_group_columns(self):
+    def test_audit_data_missing_group_columns(self, policy_df):
         """测试缺失分组列检测"""
-        df = pd.DataFrame({
-            'date': pd.date_range('2023-01-01', periods=50, freq='D'),
-            'amount': np.random.normal(100, 20, 50),
-            'y': np.random.binomial(1, 0.3, 50)
-        })
+        df = policy_df(50)
         
         policy = CVPolicy(
             cv_type='group',
@@ -106,13 +117,9 @@ class TestCVPolicyAuditor:
         assert len(missing_violations) > 0
         assert missing_violations[0]['severity'] == 'high'
     
-    def test_audit_data_insufficient_data(self):
+    def test_audit_data_insufficient_data(self, policy_df):
         """测试数据量不足检测"""
-        df = pd.DataFrame({
-            'date': pd.date_range('2023-01-01', periods=5, freq='D'),
-            'amount': np.random.normal(100, 20, 5),
-            'y': np.random.binomial(1, 0.3, 5)
-        })
+        df = policy_df(5)
         
         policy = CVPolicy(
             cv_type='timeseries',
@@ -133,14 +140,9 @@ class TestCVPolicyAuditor:
         assert len(insufficient_violations) > 0
         assert insufficient_violations[0]['severity'] == 'high'
     
-    def test_audit_data_compliant(self):
+    def test_audit_data_compliant(self, policy_df):
         """测试合规数据"""
-        df = pd.DataFrame({
-            'date': pd.date_range('2023-01-01', periods=100, freq='D'),
-            'user_id': ['user_001'] * 100,
-            'amount': np.random.normal(100, 20, 100),
-            'y': np.random.binomial(1, 0.3, 100)
-        })
+        df = policy_df(100, with_user=True)
         
         policy = CVPolicy(
             cv_type='timeseries',
@@ -161,60 +163,39 @@ class TestCVPolicyAuditor:
         assert len(result['violations']) == 0
         assert result['summary']['compliance_status'] == 'compliant'
     
-    def test_audit_cv_policy_convenience_function(self):
+    def test_audit_cv_policy_convenience_function(self, tmp_path, policy_df):
         """测试便捷函数"""
-        df = pd.DataFrame({
-            'date': pd.date_range('2023-01-01', periods=50, freq='D'),
-            'amount': np.random.normal(100, 20, 50),
-            'y': np.random.binomial(1, 0.3, 50)
-        })
+        df = policy_df(50)
         
         # 创建临时策略文件
-        policy_data = {
-            'cv_type': 'kfold',
-            'n_splits': 5,
-            'time_col': 'date'
-        }
+        policy_file = tmp_path / 'policy.yaml'
+        policy_file.write_text(_POLICY_KFOLD)
+        
+        result = audit_cv_policy(df, 'y', 'date', str(policy_file))
         
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.yaml', delete=False) as f:
-            yaml.dump(policy_data, f)
-            policy_file = f.name
-        
-        try:
-            result = audit_cv_policy(df, 'y', 'date', policy_file)
-            
-            assert result['status'] == 'audited'
-            assert 'violations' in result
-            assert 'summary' in result
-        finally:
-            os.unlink(policy_file)
+        assert result['status'] == 'audited'
+        assert 'violations' in result
+        assert 'summary' in result
 
 class TestReportExporter:
     """测试报告导出器"""
     
-    def test_export_pdf_fallback(self):
+    def test_export_pdf_fallback(self, tmp_path):
         """测试PDF导出回退"""
         exporter = ReportExporter()
         
         # 创建临时HTML文件
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.html', delete=False) as f:
-            f.write('<html><body><h1>Test</h1></body></html>')
-            html_file = f.name
-        
-        try:
-            pdf_file = html_file.replace('.html', '.pdf')
-            result = exporter.export_pdf(html_file, pdf_file)
-            
-            # 应该回退到HTML（因为weasyprint可能不可用）
-            assert result['status'] in ['success', 'fallback']
-            if result['status'] == 'fallback':
-                assert 'install_hint' in result
-        finally:
-            os.unlink(html_file)
-            if os.path.exists(html_file.replace('.html', '.pdf')):
-                os.unlink(html_file.replace('.html', '.pdf'))
+        html_file = tmp_path / 'report.html'
+        html_file.write_text('<html><body><h1>Test</h1></body></html>')
+        
+        result = exporter.export_pdf(str(html_file), str(tmp_path / 'report.pdf'))
+        
+        # 应该回退到HTML（因为weasyprint可能不可用）
+        assert result['status'] in ['success', 'fallback']
+        if result['status'] == 'fallback':
+            assert 'install_hint' in result
     
-    def test_export_sarif(self):
+    def test_export_sarif(self, tmp_path):
         """测试SARIF导出"""
         exporter = ReportExporter()
         
@@ -231,28 +212,24 @@ class TestReportExporter:
             ]
         }
         
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.sarif', delete=False) as f:
-            sarif_file = f.name
-        
-        try:
-            result = exporter.export_sarif(results, sarif_file)
-            
-            assert result['status'] == 'success'
-            assert result['output_file'] == sarif_file
-            assert result['results_count'] > 0
-            
-            # 验证SARIF文件内容
-            with open(sarif_file, 'r') as f:
-                sarif_data = json.load(f)
-            
-            assert sarif_data['$schema'] is not None
-            assert 'runs' in sarif_data
-            assert len(sarif_data['runs']) > 0
-            assert 'results' in sarif_data['runs'][0]
-        finally:
-            os.unlink(sarif_file)
+        sarif_file = str(tmp_path / 'leakage.sarif')
+        
+        result = exporter.export_sarif(results, sarif_file)
+        
+        assert result['status'] == 'success'
+        assert result['output_file'] == sarif_file
+        assert result['results_count'] > 0
+        
+        # 验证SARIF文件内容
+        with open(sarif_file, 'r') as f:
+            sarif_data = json.load(f)
+        
+        assert sarif_data['$schema'] is not None
+        assert 'runs' in sarif_data
+        assert len(sarif_data['runs']) > 0
+        assert 'results' in sarif_data['runs'][0]
     
-    def test_export_convenience_function(self):
+    def test_export_convenience_function(self, tmp_path):
         """测试便捷函数"""
         # 创建测试结果
         results = {
@@ -267,162 +244,151 @@ class TestReportExporter:
             ]
         }
         
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.sarif', delete=False) as f:
-            sarif_file = f.name
+        sarif_file = str(tmp_path / 'leakage.sarif')
+        
+        result = export_report(None, sarif_file, 'sarif', results)
         
-        try:
-            result = export_report(None, sarif_file, 'sarif', results)
-            
-            assert result['status'] == 'success'
-            assert result['output_file'] == sarif_file
-        finally:
-            os.unlink(sarif_file)
+        assert result['status'] == 'success'
+        assert result['output_file'] == sarif_file
 
+@pytest.mark.slow
 class TestCLIIntegration:
     """测试CLI集成"""
     
-    def test_cli_with_cv_policy(self):
+    def test_cli_with_cv_policy(self, tmp_path, policy_df, fast_to_csv):
         """测试带CV策略的CLI"""
         # 创建测试数据
-        df = pd.DataFrame({
-            'date': pd.date_range('2023-01-01', periods=50, freq='D'),
-            'user_id': ['user_001'] * 50,
-            'amount': np.random.normal(100, 20, 50),
-            'y': np.random.binomial(1, 0.3, 50)
-        })
+        df = policy_df(50, with_user=True)
         
         # 创建临时文件
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.csv', delete=False) as f:
-            df.to_csv(f, index=False)
-            data_file = f.name
-        
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.yaml', delete=False) as f:
-            policy_data = {
-                'cv_type': 'timeseries',
-                'n_splits': 5,
-                'time_col': 'date',
-                'group_cols': ['user_id']
-            }
-            yaml.dump(policy_data, f)
-            policy_file = f.name
-        
-        try:
-            result = run(
-                train_path=data_file,
-                target='y',
-                time_col='date',
-                out_dir='test_cv_policy_output',
-                cv_type='timeseries',
-                simulate_cv=None,
-                leak_threshold=0.02,
-                cv_policy_file=policy_file,
-                export=None,
-                export_sarif=None
-            )
-            
-            assert result['status'] == 'success'
-            assert 'policy_audit' in result['data']
-            assert result['data']['policy_audit']['status'] == 'audited'
-        finally:
-            os.unlink(data_file)
-            os.unlink(policy_file)
-            if os.path.exists('test_cv_policy_output'):
-                import shutil
-                shutil.rmtree('test_cv_policy_output')
+        data_file = tmp_path / 'train.csv'
+        fast_to_csv(df, data_file)
+        
+        policy_file = tmp_path / 'policy.yaml'
+        policy_file.write_text(_POLICY_TIMESERIES)
+        
+        result = run(
+            train_path=str(data_file),
+            target='y',
+            time_col='date',
+            out_dir=str(tmp_path / 'out'),
+            cv_type='timeseries',
+            simulate_cv=None,
+            leak_threshold=0.02,
+            cv_policy_file=str(policy_file),
+            export=None,
+            export_sarif=None
+        )
+        
+        assert result['status'] == 'success'
+        assert 'policy_audit' in result['data']
+        assert result['data']['policy_audit']['status'] == 'audited'
     
-    def test_cli_with_export(self):
-        """测试带导出的CLI"""
+    def test_cli_with_export_sarif_only(self, tmp_path, policy_df, fast_to_csv):
+        """测试带SARIF导出的CLI"""
         # 创建测试数据
-        df = pd.DataFrame({
-            'date': pd.date_range('2023-01-01', periods=30, freq='D'),
-            'amount': np.random.normal(100, 20, 30),
-            'y': np.random.binomial(1, 0.3, 30)
-        })
-        
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.csv', delete=False) as f:
-            df.to_csv(f, index=False)
-            data_file = f.name
-        
-        try:
-            result = run(
-                train_path=data_file,
-                target='y',
-                time_col='date',
-                out_dir='test_export_output',
-                cv_type='timeseries',
-                simulate_cv=None,
-                leak_threshold=0.02,
-                cv_policy_file=None,
-                export='pdf',
-                export_sarif='test_export_output/leakage.sarif'
-            )
-            
-            assert result['status'] == 'success'
-            assert 'exports' in result['data']
-            
-            # 检查导出结果
-            if 'pdf' in result['data']['exports']:
-                pdf_result = result['data']['exports']['pdf']
-                assert pdf_result['status'] in ['success', 'fallback']
-            
-            if 'sarif' in result['data']['exports']:
-                sarif_result = result['data']['exports']['sarif']
-                assert sarif_result['status'] == 'success'
-        finally:
-            os.unlink(data_file)
-            if os.path.exists('test_export_output'):
-                import shutil
-                shutil.rmtree('test_export_output')
+        df = policy_df(30)
+        
+        data_file = tmp_path / 'train.csv'
+        fast_to_csv(df, data_file)
+        out_dir = tmp_path / 'out'
+        
+        result = run(
+            train_path=str(data_file),
+            target='y',
+            time_col='date',
+            out_dir=str(out_dir),
+            cv_type='timeseries',
+            simulate_cv=None,
+            leak_threshold=0.02,
+            cv_policy_file=None,
+            export=None,
+            export_sarif=str(out_dir / 'leakage.sarif')
+        )
+        
+        assert result['status'] == 'success'
+        assert 'pdf' not in result['data']['exports']
+        assert result['data']['exports']['sarif']['status'] == 'success'
+    
+    @pytest.mark.skipif(not _HAS_WEASY, reason="weasyprint not installed")
+    def test_cli_with_export_pdf(self, tmp_path, policy_df, fast_to_csv):
+        """测试带PDF导出的CLI（需要weasyprint）"""
+        df = policy_df(30)
+        
+        data_file = tmp_path / 'train.csv'
+        fast_to_csv(df, data_file)
+        out_dir = tmp_path / 'out'
+        
+        result = run(
+            train_path=str(data_file),
+            target='y',
+            time_col='date',
+            out_dir=str(out_dir),
+            cv_type='timeseries',
+            simulate_cv=None,
+            leak_threshold=0.02,
+            cv_policy_file=None,
+            export='pdf',
+            export_sarif=None
+        )
+        
+        assert result['status'] == 'success'
+        assert result['data']['exports']['pdf']['status'] in ['success', 'fallback']
+    
+    def test_cli_with_export_pdf_fallback(self, tmp_path, policy_df, fast_to_csv, monkeypatch):
+        """测试weasyprint不可用时CLI的PDF导出回退到HTML"""
+        monkeypatch.setattr(ReportExporter, "_weasyprint_probe", False)
+        df = policy_df(30)
+        
+        data_file = tmp_path / 'train.csv'
+        fast_to_csv(df, data_file)
+        out_dir = tmp_path / 'out'
+        
+        result = run(
+            train_path=str(data_file),
+            target='y',
+            time_col='date',
+            out_dir=str(out_dir),
+            cv_type='timeseries',
+            export='pdf'
+        )
+        
+        assert result['status'] == 'success'
+        pdf = result['data']['exports']['pdf']
+        assert pdf['status'] == 'fallback'
+        assert pdf['output_file'] == str(out_dir / 'report.html')
 
 class TestEdgeCases:
     """测试边界情况"""
     
-    def test_missing_policy_file(self):
+    def test_missing_policy_file(self, policy_df):
         """测试缺失策略文件"""
-        df = pd.DataFrame({
-            'amount': np.random.normal(100, 20, 30),
-            'y': np.random.binomial(1, 0.3, 30)
-        })
+        df = policy_df(30, with_date=False)
         
         result = audit_cv_policy(df, 'y', None, 'nonexistent.yaml')
         
         assert result['status'] == 'no_policy'
         assert 'No policy file loaded' in result['message']
     
-    def test_invalid_policy_file(self):
+    def test_invalid_policy_file(self, tmp_path, policy_df):
         """测试无效策略文件"""
-        df = pd.DataFrame({
-            'amount': np.random.normal(100, 20, 30),
-            'y': np.random.binomial(1, 0.3, 30)
-        })
-        
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.yaml', delete=False) as f:
-            f.write('invalid: yaml: content: [')
-            policy_file = f.name
-        
-        try:
-            result = audit_cv_policy(df, 'y', None, policy_file)
-            
-            assert result['status'] == 'no_policy'
-        finally:
-            os.unlink(policy_file)
+        df = policy_df(30, with_date=False)
+        
+        policy_file = tmp_path / 'policy.yaml'
+        policy_file.write_text('invalid: yaml: content: [')
+        
+        result = audit_cv_policy(df, 'y', None, str(policy_file))
+        
+        assert result['status'] == 'no_policy'
     
     def test_empty_results_sarif(self):
-        """测试空结果的SARIF导出"""
+        """测试空结果的SARIF转换（直接断言构建出的字典，不落盘）"""
         exporter = ReportExporter()
         
-        results = {'risks': []}
-        
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.sarif', delete=False) as f:
-            sarif_file = f.name
+        sarif_data = exporter._convert_to_sarif({'risks': []})
         
-        try:
-            result = exporter.export_sarif(results, sarif_file)
-            
-            assert result['status'] == 'success'
-            assert result['results_count'] == 0
-        finally:
-            os.unlink(sarif_file)
+        assert sarif_data['version'] == '2.1.0'
+        assert len(sarif_data['runs'][0]['results']) == 0
 
 if __name__ == '__main__':
     pytest.main([__file__, '-v'])
@@ -0,0 +1,59 @@
+from pathlib import Path
+import pandas as pd
+import numpy as np
+
+def test_estimate_memory_usage_counts_rows(tmp_path: Path):
+    """测试内存估算的行数统计（末行无换行符）及小文件按实际样本行数折算"""
+    from leakage_buster.core.loader import estimate_memory_usage
+    csv = tmp_path / "small.csv"
+    csv.write_bytes(b"a,b\n1,2\n3,4\n5,6")
+    info = estimate_memory_usage(str(csv), sample_rows=1000)
+    assert info["total_rows"] == 3 and info["columns"] == 2
+    assert info["estimated_memory_mb"] == info["sample_memory_mb"]
+
+def test_sampled_load_streams_chunks(tmp_path: Path):
+    """测试超出内存上限时的采样加载：逐块抽样，保留原文件顺序与行位置"""
+    from leakage_buster.core.loader import DataLoader
+    df = pd.DataFrame({"x": np.arange(1000), "y": np.arange(1000) % 2})
+    csv = tmp_path / "big.csv"
+    df.to_csv(csv, index=False)
+    loader = DataLoader(memory_cap_mb=0, chunk_size=128, sample_ratio=0.25)
+    sampled = loader.load_data(str(csv))
+    assert abs(len(sampled) - 250) <= 8
+    assert sampled.index.is_monotonic_increasing
+    assert (sampled["x"].to_numpy() == sampled.index.to_numpy()).all()
+
+def test_parse_cache_opt_in_and_lru(tmp_path: Path):
+    """测试解析缓存默认关闭；--cache 启用后写入缓存目录，并按LRU限制文件数"""
+    from leakage_buster.cli import run
+    from leakage_buster.core import loader
+    df = pd.DataFrame({"x": np.arange(50) % 7, "y": np.arange(50) % 2})
+    csv = tmp_path / "train.csv"
+    df.to_csv(csv, index=False)
+    cache_dir = Path(loader.DEFAULT_CACHE_DIR)
+    
+    run(str(csv), target="y", time_col=None, out_dir=str(tmp_path / "a"))
+    assert not cache_dir.exists()
+    run(str(csv), target="y", time_col=None, out_dir=str(tmp_path / "b"), cache=True)
+    assert len(list(cache_dir.glob("*.parquet"))) == 1
+    
+    dl = loader.DataLoader(cache_dir=str(cache_dir))
+    for i in range(3):
+        f = tmp_path / f"f{i}.csv"
+        df.to_csv(f, index=False)
+        pd.testing.assert_frame_equal(dl.load_data(str(f)), df)
+    dl._evict_cache(max_entries=2)
+    assert len(list(cache_dir.glob("*.parquet"))) == 2
+
+def test_read_csv_fast_matches_c_engine_dtypes(tmp_path: Path):
+    """测试pyarrow读取结果与C引擎一致：日期/时间戳列保留为字符串，字符串列缺失值为NaN，只有表头时各列为object"""
+    from leakage_buster.core.loader import read_csv_fast
+    csv = tmp_path / "dates.csv"
+    csv.write_text("date,ts,s,x\n2024-01-01,2024-01-01 10:00:00,a,1\n,2024-01-02T11:30:00,,2\n2024-01-03,,c,3\n")
+    pd.testing.assert_frame_equal(read_csv_fast(str(csv)), pd.read_csv(csv))
+    pd.testing.assert_frame_equal(read_csv_fast(str(csv), usecols=["ts", "x"]), pd.read_csv(csv, usecols=["ts", "x"]))
+    assert np.isnan(read_csv_fast(str(csv))["s"].iloc[1])
+    
+    header_only = tmp_path / "empty.csv"
+    header_only.write_text("s,x\n")
+    pd.testing.assert_frame_equal(read_csv_fast(str(header_only)), pd.read_csv(header_only))
@@ -1,11 +1,16 @@
 
 import json
+import re
 import pytest
 from pathlib import Path
 from leakage_buster.cli import run
 import pandas as pd
 import numpy as np
 
+# 报告内容断言用的模式：每个测试对HTML只扫描一遍，再对命中集合做判断
+_REPORT_PATTERNS = re.compile(r"Target leakage|Target encoding|Statistical Leakage Detection")
+
+@pytest.mark.slow
 def test_json_output_schema(tmp_path: Path):
     """测试JSON输出结构符合schema规范"""
     # 创建测试数据
@@ -23,12 +28,10 @@ def test_json_output_schema(tmp_path: Path):
         "leak_score": leak
     })
     
-    csv = tmp_path / "test.csv"
-    df.to_csv(csv, index=False)
     out = tmp_path / "out"
     
     # 运行检测
-    result = run(str(csv), target="y", time_col="date", out_dir=str(out), cv_type="timeseries")
+    result = run(df, target="y", time_col="date", out_dir=str(out), cv_type="timeseries")
     
     # 验证输出结构
     assert isinstance(result, dict)
@@ -70,7 +73,7 @@ def test_json_output_schema(tmp_path: Path):
     
     # 验证args结构
     args = meta["args"]
-    assert args["train"] == str(csv)
+    assert args["train"] == "<dataframe>"
     assert args["target"] == "y"
     assert args["time_col"] == "date"
     assert args["cv_type"] == "timeseries"
@@ -82,6 +85,7 @@ def test_json_output_schema(tmp_path: Path):
     assert meta["n_rows"] == n
     assert meta["n_cols"] == 4
 
+@pytest.mark.slow
 def test_risk_item_schema(tmp_path: Path):
     """测试风险项结构符合schema规范"""
     # 创建有明显泄漏的数据
@@ -94,9 +98,9 @@ def test_risk_item_schema(tmp_path: Path):
     
     # 创建疑似目标编码特征
     category = rng.choice(['A', 'B', 'C'], size=n)
-    df_temp = pd.DataFrame({'category': category, 'y': y})
-    category_mean = df_temp.groupby('category')['y'].mean()
-    te_feature = df_temp['category'].map(category_mean) + rng.normal(0, 0.01, size=n)
+    _, inverse = np.unique(category, return_inverse=True)
+    category_mean = np.bincount(inverse, weights=y) / np.bincount(inverse)  # 各类别的目标均值
+    te_feature = category_mean[inverse] + rng.normal(0, 0.01, size=n)
     te_feature = np.clip(te_feature, 0, 1)
     
     df = pd.DataFrame({
@@ -107,11 +111,9 @@ def test_risk_item_schema(tmp_path: Path):
         "normal_feature": rng.normal(0, 1, size=n)
     })
     
-    csv = tmp_path / "leak_test.csv"
-    df.to_csv(csv, index=False)
     out = tmp_path / "leak_out"
     
-    result = run(str(csv), target="y", time_col=None, out_dir=str(out))
+    result = run(df, target="y", time_col=None, out_dir=str(out))
     
     # 验证输出结构
     assert result["status"] == "success"
@@ -126,7 +128,8 @@ def test_risk_item_schema(tmp_path: Path):
         report_content = f.read()
     
     # 验证报告包含预期的风险项
-    assert "Target leakage" in report_content or "Target encoding" in report_content
+    found = set(_REPORT_PATTERNS.findall(report_content))
+    assert "Target leakage" in found or "Target encoding" in found
 
 def test_exit_codes():
     """测试退出码定义"""
@@ -134,6 +137,7 @@ def test_exit_codes():
     # 由于当前实现没有明确的退出码返回，这里先做占位测试
     pass
 
+@pytest.mark.slow
 def test_statistical_leakage_preview(tmp_path: Path):
     """测试统计类泄漏预览功能"""
     n = 300
@@ -149,11 +153,9 @@ def test_statistical_leakage_preview(tmp_path: Path):
         "normal_feature": rng.normal(0, 1, size=n)
     })
     
-    csv = tmp_path / "stat_test.csv"
-    df.to_csv(csv, index=False)
     out = tmp_path / "stat_out"
     
-    result = run(str(csv), target="y", time_col=None, out_dir=str(out))
+    result = run(df, target="y", time_col=None, out_dir=str(out))
     
     # 验证输出
     assert result["status"] == "success"
@@ -164,8 +166,7 @@ def test_statistical_leakage_preview(tmp_path: Path):
         report_content = f.read()
     
     # 验证包含统计类泄漏预览分区
-    assert "Statistical Leakage Detection" in report_content
-    assert "Statistical Leakage Detection" in report_content
+    assert "Statistical Leakage Detection" in set(_REPORT_PATTERNS.findall(report_content))
 
 def test_detector_registry():
     """测试检测器注册表功能"""
@@ -190,12 +191,10 @@ def test_detector_registry():
     risks = stat_detector.detect(df, "y")
     
     # 验证返回的风险项结构
-    for risk in risks:
-        assert hasattr(risk, 'name')
-        assert hasattr(risk, 'severity')
-        assert hasattr(risk, 'detail')
-        assert hasattr(risk, 'evidence')
-        assert risk.severity in ['high', 'medium', 'low']
+    required = {"name", "severity", "detail", "evidence"}
+    bad = [r for r in risks
+           if not required.issubset(vars(r)) or r.severity not in {"high", "medium", "low"}]
+    assert not bad
 
 def test_backward_compatibility():
     """测试向后兼容性"""
@@ -217,11 +216,8 @@ def test_backward_compatibility():
     assert isinstance(result["risks"], list)
     
     # 验证每个风险项都有正确的结构
-    for risk in result["risks"]:
-        assert "name" in risk
-        assert "severity" in risk
-        assert "detail" in risk
-        assert "evidence" in risk
+    required = {"name", "severity", "detail", "evidence"}
+    assert all(required <= risk.keys() for risk in result["risks"])
 
 def test_error_handling(tmp_path: Path):
     """测试错误处理"""
@@ -240,4 +236,10 @@ def test_error_handling(tmp_path: Path):
     assert result["status"] == "error"
     assert result["exit_code"] == 4
     assert "error" in result
+    
+    # 测试时间列不存在（仅凭表头即可判定）
+    result = run(str(csv), target="y", time_col="nonexistent", out_dir=str(tmp_path))
+    assert result["status"] == "error"
+    assert result["exit_code"] == 4
+    assert result["error"]["details"]["available_columns"] == ["x", "y"]
 